@@ -1,11 +1,16 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
-from app import models, schemas, database
+from starlette.concurrency import run_in_threadpool
+from app import models, schemas, database, metrics
+from app.password_pool import PasswordHasher
+from app.principal_cache import Principal, PrincipalCache
 import os
 from dotenv import load_dotenv
 
@@ -18,6 +23,20 @@ SECRET_KEY = os.getenv(
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Verified token -> principal; 0 disables
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+principal_cache = PrincipalCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL) if AUTH_CACHE_SIZE > 0 else None
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    # Deactivation, privilege changes and deletes take effect on the next request
+    if principal_cache is not None:
+        principal_cache.invalidate_user(target.id)
+
 # FIXED → remove leading slash
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
@@ -30,6 +49,20 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
 
+# bcrypt runs here, never on the event loop or the shared threadpool
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+PASSWORD_QUEUE_DEPTH = int(os.getenv("PASSWORD_QUEUE_DEPTH", "0")) or None
+PASSWORD_PER_CLIENT_LIMIT = int(os.getenv("PASSWORD_PER_CLIENT_LIMIT", "2"))
+
+password_hasher = PasswordHasher(
+    get_password_hash,
+    verify_password,
+    workers=PASSWORD_WORKERS,
+    max_pending=PASSWORD_QUEUE_DEPTH,
+    per_key_limit=PASSWORD_PER_CLIENT_LIMIT,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
@@ -45,9 +78,43 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+
+# Session used by the async routes: non-blocking when DB_ASYNC is enabled
+get_auth_db = get_async_db if database.DB_ASYNC else get_db
+
+
+async def get_user_by_email(db, email: str):
+    if database.DB_ASYNC:
+        result = await db.execute(select(models.User).where(models.User.email == email))
+        return result.scalars().first()
+    # Sync sessions block, so keep them off the event loop
+    return await run_in_threadpool(
+        lambda: db.query(models.User).filter(models.User.email == email).first()
+    )
+
+
+def _commit_and_refresh(db, user):
+    db.commit()
+    db.refresh(user)
+
+
+async def add_user(db, user):
+    db.add(user)
+    if database.DB_ASYNC:
+        await db.commit()
+        await db.refresh(user)
+    else:
+        await run_in_threadpool(_commit_and_refresh, db, user)
+    return user
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_auth_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,6 +122,18 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    started = time.perf_counter()
+    key = None
+    if principal_cache is not None:
+        key = principal_cache.make_key(token)
+        principal = principal_cache.get(key)
+        if principal is not None:
+            elapsed = time.perf_counter() - started
+            principal_cache.record_latency(True, elapsed)
+            if metrics.METRICS_ENABLED:
+                metrics.auth_seconds.observe(elapsed, "hit")
+            return principal
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -63,10 +142,18 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = await get_user_by_email(db, email)
     if user is None:
         raise credentials_exception
-    return user
+
+    principal = Principal.from_user(user)
+    elapsed = time.perf_counter() - started
+    if principal_cache is not None:
+        principal_cache.put(key, principal, payload.get("exp"))
+        principal_cache.record_latency(False, elapsed)
+    if metrics.METRICS_ENABLED:
+        metrics.auth_seconds.observe(elapsed, "miss" if principal_cache is not None else "off")
+    return principal
 
 
 async def get_current_active_user(
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-car predictions into vectorized batches.
+
+    Requests are queued on the event loop; a collector task flushes a
+    window once ``max_batch_size`` cars are waiting or ``max_wait_ms`` has
+    passed since the first one arrived, scores it with one ``score_many``
+    call and resolves each caller's future. A plain ``score_many`` runs in
+    the threadpool; a coroutine function is awaited directly.
+    """
+
+    def __init__(self, score_many, max_batch_size=32, max_wait_ms=5.0, max_concurrent_batches=2):
+        self.score_many = score_many
+        self._score_is_async = asyncio.iscoroutinefunction(score_many)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._queue = None
+        self._full = None
+        self._slots = None
+        self._collector = None
+        self._inflight = set()
+
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+        self.wait_seconds_total = 0.0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        # Fail anything still queued rather than leaving callers hanging
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def submit(self, car):
+        if self._collector is None:
+            raise RuntimeError("Prediction batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((car, future, time.perf_counter()))
+        if self._queue.qsize() >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _collect(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = [await self._queue.get()]
+                if self._queue.qsize() < self.max_batch_size - 1:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.max_wait)
+                    except asyncio.TimeoutError:
+                        pass
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+            except BaseException:
+                self._slots.release()
+                raise
+
+            task = asyncio.create_task(self._flush(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, batch):
+        try:
+            # Callers that already went away don't need scoring
+            live = [item for item in batch if not item[1].done()]
+            if not live:
+                return
+
+            started = time.perf_counter()
+            self._record(len(live), sum(started - queued_at for _, _, queued_at in live))
+            try:
+                results = await self._score([car for car, _, _ in live])
+            except Exception as e:
+                self.errors += 1
+                if len(live) > 1:
+                    # One bad row (e.g. an unparseable date) must not fail its
+                    # neighbours: rescore the window row by row
+                    logger.warning("Micro-batch of %d failed (%s); scoring rows individually", len(live), e)
+                    await self._flush_singly(live)
+                elif not live[0][1].done():
+                    live[0][1].set_exception(e)
+                return
+
+            for (_, future, _), result in zip(live, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    async def _score(self, cars):
+        if self._score_is_async:
+            return await self.score_many(cars)
+        return await run_in_threadpool(self.score_many, cars)
+
+    async def _flush_singly(self, live):
+        for car, future, _ in live:
+            if future.done():
+                continue
+            try:
+                result = (await self._score([car]))[0]
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _record(self, size, waited):
+        self.batches += 1
+        self.rows += size
+        self.wait_seconds_total += waited
+        self.batch_size_counts[bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+
+    def stats(self):
+        histogram = {
+            f"le_{bound}": count
+            for bound, count in zip(BATCH_SIZE_BUCKETS, self.batch_size_counts)
+        }
+        histogram[f"gt_{BATCH_SIZE_BUCKETS[-1]}"] = self.batch_size_counts[-1]
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "inflight_batches": len(self._inflight),
+            "batches": self.batches,
+            "rows": self.rows,
+            "errors": self.errors,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "mean_queue_wait_ms": round(self.wait_seconds_total / self.rows * 1000, 3) if self.rows else 0.0,
+            "batch_size_histogram": histogram,
+        }
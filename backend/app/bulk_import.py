@@ -0,0 +1,269 @@
+"""Streaming NDJSON/CSV import for vehicles and service records.
+
+The request body is read chunk by chunk and split into records as it
+arrives. Records are validated against the create schema, and every
+IMPORT_CHUNK_SIZE valid ones are written with one executemany INSERT in
+their own transaction, so memory stays flat however large the upload is
+and a bad row only costs itself. The report lists failed rows by line
+number, capped at IMPORT_MAX_ERRORS.
+"""
+import codecs
+import csv
+import json
+import os
+import time
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app import models, schemas
+from app.database import engine
+from app.stats import StatsDelta
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+IMPORT_MAX_RECORD_BYTES = int(os.getenv("IMPORT_MAX_RECORD_BYTES", str(64 * 1024)))
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json")
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+class ImportReport:
+    def __init__(self, max_errors=IMPORT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.received = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def fail(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def result(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "received": self.received,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.imported / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+def body_format(content_type):
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    if media_type in CSV_TYPES:
+        return "csv"
+    raise HTTPException(status_code=415, detail="Upload NDJSON (application/x-ndjson) or CSV (text/csv)")
+
+
+async def iter_lines(chunks, max_bytes=IMPORT_MAX_RECORD_BYTES):
+    """Yield (line_number, line) from an async stream of byte chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_number = 0
+    async for chunk in chunks:
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail=f"Upload is not UTF-8 (after line {line_number})")
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip("\r")
+        if len(pending) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Line {line_number + 1} is longer than {max_bytes} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+async def iter_ndjson(lines):
+    async for line_number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+async def iter_csv(lines, max_bytes=IMPORT_MAX_RECORD_BYTES):
+    header = None
+    record, start = "", None
+    async for line_number, line in lines:
+        # A quoted field may span lines; the record is complete once its quotes balance
+        record = f"{record}\n{line}" if start is not None else line
+        start = start or line_number
+        if record.count('"') % 2:
+            if len(record) > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Record at line {start} is longer than {max_bytes} bytes")
+            continue
+        text, record_line, record, start = record, start, "", None
+
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_line, None, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_line, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not given" so optional fields fall back to their defaults
+        yield record_line, {name: value for name, value in zip(header, values) if value != ""}, None
+
+    if start is not None:
+        yield start, None, "Unterminated quoted field"
+
+
+def validate(schema, line_number, record, report):
+    try:
+        return schema.model_validate(record)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+        )
+        report.fail(line_number, problems)
+        return None
+
+
+class VehicleImporter:
+    schema = schemas.VehicleCreate
+    model = models.Vehicle
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def prepare(self, connection, rows):
+        """Split a chunk into insert parameters and (line, error) rejects."""
+        vins = [item.vin for _, item in rows if item.vin]
+        taken = set()
+        if vins:
+            taken = set(connection.execute(
+                select(models.Vehicle.vin).where(models.Vehicle.vin.in_(vins))
+            ).scalars())
+
+        params, rejects = [], []
+        for line_number, item in rows:
+            if item.vin and item.vin in taken:
+                rejects.append((line_number, f"vin: {item.vin} is already registered"))
+                continue
+            if item.vin:
+                taken.add(item.vin)
+            params.append((line_number, {**item.model_dump(), "user_id": self.user_id}))
+
+        # Same rule as POST /vehicles/: the last default wins
+        defaults = [row for _, row in params if row["is_default"]]
+        if defaults:
+            connection.execute(
+                update(models.Vehicle)
+                .where(models.Vehicle.user_id == self.user_id, models.Vehicle.is_default == True)
+                .values(is_default=False)
+            )
+            for row in defaults[:-1]:
+                row["is_default"] = False
+        return params, rejects
+
+    def count(self, delta, n):
+        delta.add_vehicle(self.user_id, n)
+
+
+class ServiceRecordImporter:
+    schema = schemas.ServiceRecordCreate
+    model = models.ServiceRecord
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def prepare(self, connection, rows):
+        vehicle_ids = {item.vehicle_id for _, item in rows if item.vehicle_id is not None}
+        owned = set()
+        if vehicle_ids:
+            owned = set(connection.execute(
+                select(models.Vehicle.id).where(
+                    models.Vehicle.user_id == self.user_id,
+                    models.Vehicle.id.in_(vehicle_ids),
+                )
+            ).scalars())
+
+        params, rejects = [], []
+        for line_number, item in rows:
+            if item.vehicle_id is not None and item.vehicle_id not in owned:
+                rejects.append((line_number, f"vehicle_id: vehicle {item.vehicle_id} not found"))
+                continue
+            params.append((line_number, {**item.model_dump(), "user_id": self.user_id}))
+        return params, rejects
+
+    def count(self, delta, n):
+        delta.add_service(self.user_id, n)
+
+
+def write_chunk(importer, rows, report):
+    """Insert one validated chunk in its own transaction.
+
+    If the batch hits a constraint (e.g. a concurrent insert took a vin),
+    it is retried row by row so only the offending rows are reported.
+    """
+    try:
+        with engine.begin() as connection:
+            params, rejects = importer.prepare(connection, rows)
+            if params:
+                connection.execute(insert(importer.model), [row for _, row in params])
+                delta = StatsDelta()
+                importer.count(delta, len(params))
+                delta.apply(connection)
+    except IntegrityError:
+        if len(rows) == 1:
+            raise
+    else:
+        report.imported += len(params)
+        for line_number, message in rejects:
+            report.fail(line_number, message)
+        return
+
+    for row in rows:
+        try:
+            write_chunk(importer, [row], report)
+        except IntegrityError as e:
+            report.fail(row[0], f"Rejected by the database: {e.orig}")
+
+
+async def run_import(importer, request):
+    parse = iter_ndjson if body_format(request.headers.get("content-type")) == "ndjson" else iter_csv
+    report = ImportReport()
+    chunk = []
+    async for line_number, record, error in parse(iter_lines(request.stream())):
+        report.received += 1
+        if error:
+            report.fail(line_number, error)
+            continue
+        item = validate(importer.schema, line_number, record, report)
+        if item is not None:
+            chunk.append((line_number, item))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            # Not reading ahead while the chunk is written keeps the upload back-pressured
+            await run_in_threadpool(write_chunk, importer, chunk, report)
+            chunk = []
+    if chunk:
+        await run_in_threadpool(write_chunk, importer, chunk, report)
+    return report.result()
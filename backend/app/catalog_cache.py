@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from sqlalchemy.orm import joinedload
+
+from app import models, schemas
+
+CATALOG_SNAPSHOT_MAX_AGE = float(os.getenv("CATALOG_SNAPSHOT_MAX_AGE", "60"))
+
+
+class CatalogSnapshot:
+    """The whole make/model catalog, serialized once and served as bytes.
+
+    Admin writes call ``invalidate()``; other worker processes pick up the
+    change when their copy is older than ``max_age_seconds``. The ETag is a
+    hash of the body, so a rebuild with unchanged content keeps it.
+    """
+
+    def __init__(self, max_age_seconds=CATALOG_SNAPSHOT_MAX_AGE):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._body = None
+        self._etag = None
+        self._built_at = 0.0
+        self._generation = 0
+        self.builds = 0
+
+    def get(self, db):
+        with self._lock:
+            body, etag = self._body, self._etag
+            fresh = body is not None and time.monotonic() - self._built_at < self.max_age_seconds
+            generation = self._generation
+        if fresh:
+            return body, etag
+
+        body, etag = self.build(db)
+        with self._lock:
+            # Don't store a snapshot that an admin write invalidated mid-build
+            if generation == self._generation:
+                self._body, self._etag = body, etag
+                self._built_at = time.monotonic()
+            self.builds += 1
+        return body, etag
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._body = None
+            self._etag = None
+
+    @staticmethod
+    def build(db):
+        # One query: makes LEFT OUTER JOIN models
+        makes = (
+            db.query(models.VehicleMake)
+            .options(joinedload(models.VehicleMake.models))
+            .order_by(models.VehicleMake.id)
+            .all()
+        )
+        payload = [
+            schemas.VehicleMakeWithModels.model_validate(make).model_dump(mode="json")
+            for make in makes
+        ]
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return body, etag
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tokens = [token.strip() for token in if_none_match.split(",")]
+    return "*" in tokens or etag in tokens or f"W/{etag}" in tokens
+
+
+snapshot = CatalogSnapshot()
@@ -1,12 +1,114 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app import metrics, profiling
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Pool sizing (ignored by pools that don't support it, e.g. in-memory SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+
+# "default" keeps SQLite's stock settings; "production" enables WAL and friends
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB
+
+
+def is_sqlite(url):
+    return url.startswith("sqlite")
+
+
+def sqlite_pragmas(profile):
+    if profile != "production":
+        return []
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={SQLITE_CACHE_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def apply_sqlite_pragmas(sync_engine, profile):
+    pragmas = sqlite_pragmas(profile)
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # Per-connection settings, applied to every new pooled connection
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def engine_options(url):
+    options = {"pool_recycle": DB_POOL_RECYCLE}
+    if ":memory:" not in url and url not in ("sqlite://", "sqlite+aiosqlite://"):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    if is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def build_engine(url=SQLALCHEMY_DATABASE_URL, sqlite_profile=SQLITE_PROFILE):
+    engine = create_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(engine, sqlite_profile)
+    return engine
+
+
+engine = build_engine()
+if metrics.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+if profiling.PROFILING_ENABLED:
+    profiling.instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+# Async mode: async routes (auth) use a non-blocking engine on the same database
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_url(url):
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = async_url(SQLALCHEMY_DATABASE_URL)
+    options = engine_options(ASYNC_DATABASE_URL)
+    options.pop("connect_args", None)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **options)
+    if is_sqlite(SQLALCHEMY_DATABASE_URL):
+        apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PROFILE)
+    if metrics.METRICS_ENABLED:
+        metrics.instrument_engine(async_engine.sync_engine)
+    if profiling.PROFILING_ENABLED:
+        profiling.instrument_engine(async_engine.sync_engine)
+    # Objects outlive the session (e.g. current_user), so don't expire them on commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
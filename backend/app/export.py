@@ -0,0 +1,92 @@
+"""Streaming NDJSON/CSV export of prediction and service history.
+
+Rows come straight from a Core SELECT read in EXPORT_CHUNK_SIZE
+partitions (yield_per) and are formatted chunk by chunk, with no ORM
+objects or Pydantic models in between. The generator holds its own
+connection for the life of the response, and StreamingResponse runs it
+in the threadpool, so memory stays flat and the first rows go out as soon
+as the first partition is read.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.database import engine
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def ndjson_chunks(names, partitions):
+    dumps = json.JSONEncoder(default=_plain).encode
+    for rows in partitions:
+        yield "".join(dumps(dict(zip(names, row))) + "\n" for row in rows).encode()
+
+
+def csv_chunks(names, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in partitions:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header-only body when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def stream_rows(stmt, names, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=chunk_size).execute(stmt)
+        chunks = ndjson_chunks if fmt == "ndjson" else csv_chunks
+        yield from chunks(names, result.partitions())
+
+
+def export_scope(current_user, user_id: Optional[int], all_users: bool):
+    """The user_id to filter on, or None for everyone (superusers only)."""
+    if (all_users or user_id not in (None, current_user.id)) and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough privileges")
+    if all_users:
+        return None
+    return user_id if user_id is not None else current_user.id
+
+
+def export_response(model, schema, date_column, fmt, owner_id=None, vehicle_id=None, start=None, end=None):
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
+    names = list(schema.model_fields)
+    table = model.__table__
+    stmt = select(*(table.c[name] for name in names))
+    if owner_id is not None:
+        stmt = stmt.where(table.c.user_id == owner_id)
+    if vehicle_id is not None:
+        stmt = stmt.where(table.c.vehicle_id == vehicle_id)
+    if start is not None:
+        stmt = stmt.where(date_column >= start)
+    if end is not None:
+        stmt = stmt.where(date_column < end)
+    # Per-user exports walk the (user_id, date) index in order
+    stmt = stmt.order_by(date_column, table.c.id) if owner_id is not None else stmt.order_by(table.c.id)
+
+    filename = f"{table.name}.{fmt}"
+    return StreamingResponse(
+        stream_rows(stmt, names, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
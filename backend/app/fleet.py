@@ -0,0 +1,240 @@
+"""Re-score every registered vehicle and record the results in prediction history.
+
+Vehicles are read in id order, --chunk-size at a time, together with the date of
+each one's latest service record (falling back to when the vehicle was
+registered). Chunks are scored with one predict_many call each, spread
+over worker processes, and written back in order with one executemany
+INSERT plus the stats counters per chunk. After every written chunk the
+last vehicle id goes to the checkpoint file, so an interrupted run picks
+up where it stopped:
+
+    python -m app.fleet --workers 4
+    python -m app.fleet --workers 4            # resumes from fleet_checkpoint.json
+    python -m app.fleet --workers 4 --restart  # ignores it and starts over
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+
+from app import models
+from app.database import engine
+from app.registry import DEFAULT_REGISTRY_DIR, ML_DIR, ModelRegistry
+from app.stats import StatsDelta
+from app.write_behind import prediction_row, write_predictions
+
+DEFAULT_CHECKPOINT = "fleet_checkpoint.json"
+
+# Per-process state inside pool workers
+_worker_predictor = None
+
+
+@dataclass
+class FleetCar:
+    vehicle_id: int
+    user_id: int
+    make: str
+    model: str
+    year: int
+    mileage: float
+    engine_size: float
+    transmission: Optional[str]
+    fuel_type: Optional[str]
+    last_service_date: str
+
+
+def registry_kwargs():
+    return dict(
+        root=os.getenv("MODEL_REGISTRY_DIR", DEFAULT_REGISTRY_DIR),
+        legacy_model_path=os.getenv("MODEL_PATH", os.path.join(ML_DIR, "model.pkl")),
+    )
+
+
+def load_predictor(kwargs):
+    registry = ModelRegistry(**kwargs)
+    return registry.load_version(registry.desired_active_version(), with_cache=False)
+
+
+def _init_worker(kwargs):
+    global _worker_predictor
+    _worker_predictor = load_predictor(kwargs)
+
+
+def _worker_score(cars):
+    return _worker_predictor.predict_many(cars)
+
+
+def read_chunks(after_id, chunk_size, stats):
+    """Yield (last id, vehicles read, FleetCars) chunks in id order after ``after_id``."""
+    vehicles = models.Vehicle.__table__
+    services = models.ServiceRecord.__table__
+    while True:
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(vehicles.c.id, vehicles.c.user_id, vehicles.c.make, vehicles.c.model,
+                       vehicles.c.year, vehicles.c.mileage, vehicles.c.engine_size,
+                       vehicles.c.transmission, vehicles.c.fuel_type, vehicles.c.created_at)
+                .where(vehicles.c.id > after_id)
+                .order_by(vehicles.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                return
+            last_service = dict(connection.execute(
+                select(services.c.vehicle_id, func.max(services.c.service_date))
+                .where(services.c.vehicle_id.in_([row.id for row in rows]))
+                .group_by(services.c.vehicle_id)
+            ).all())
+
+        cars = []
+        for row in rows:
+            if row.engine_size is None:
+                stats["skipped"] += 1
+                continue
+            serviced = last_service.get(row.id)
+            if serviced is None:
+                stats["no_service_history"] += 1
+                serviced = row.created_at or datetime.utcnow()
+            cars.append(FleetCar(
+                vehicle_id=row.id, user_id=row.user_id, make=row.make, model=row.model,
+                year=row.year, mileage=row.mileage or 0.0, engine_size=row.engine_size,
+                transmission=row.transmission, fuel_type=row.fuel_type,
+                last_service_date=serviced.date().isoformat(),
+            ))
+        after_id = rows[-1].id
+        yield after_id, len(rows), cars
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def discard_uncheckpointed(state):
+    """Drop rows of a chunk that was written but not checkpointed before a crash."""
+    history = models.PredictionHistory.__table__
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(history.c.id, history.c.user_id, history.c.created_at,
+                   history.c.service_needed, history.c.estimated_days_until_service)
+            .where(history.c.created_at == datetime.fromisoformat(state["started_at"]),
+                   history.c.vehicle_id > state["last_vehicle_id"])
+        ).all()
+    if not rows:
+        return
+    delta = StatsDelta()
+    for row in rows:
+        delta.add_prediction(row.user_id, row.created_at, row.service_needed,
+                             row.estimated_days_until_service, sign=-1)
+    with engine.begin() as connection:
+        connection.execute(delete(history).where(history.c.id.in_([row.id for row in rows])))
+        delta.apply(connection)
+
+
+def write_chunk(cars, results, created_at):
+    rows = [
+        prediction_row(car.user_id, car, result, vehicle_id=car.vehicle_id, created_at=created_at)
+        for car, result in zip(cars, results)
+    ]
+    if rows:
+        write_predictions(rows)
+    return len(rows)
+
+
+def run(workers=2, chunk_size=2000, checkpoint=DEFAULT_CHECKPOINT, restart=False, log=print):
+    state = None if restart else load_checkpoint(checkpoint)
+    if state is None:
+        state = {"started_at": datetime.utcnow().isoformat(), "last_vehicle_id": 0, "scored": 0}
+    elif state.get("finished"):
+        log(f"Run started {state['started_at']} already finished; pass --restart to score again")
+        return state
+    else:
+        log(f"Resuming run started {state['started_at']} after vehicle {state['last_vehicle_id']}")
+        discard_uncheckpointed(state)
+
+    # One created_at per run, so a resumed run still reads as a single refresh
+    created_at = datetime.fromisoformat(state["started_at"])
+    stats = {"skipped": 0, "no_service_history": 0}
+    with engine.connect() as connection:
+        total = connection.execute(
+            select(func.count()).select_from(models.Vehicle).where(models.Vehicle.id > state["last_vehicle_id"])
+        ).scalar_one()
+
+    kwargs = registry_kwargs()
+    started = time.perf_counter()
+    done = scored = 0
+
+    def committed(last_id, seen, cars, results):
+        nonlocal done, scored
+        written = write_chunk(cars, results, created_at)
+        scored += written
+        state["scored"] += written
+        state["last_vehicle_id"] = last_id
+        save_checkpoint(checkpoint, state)
+        done += seen
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        log(f"{done}/{total} vehicles  {rate:.0f}/s  eta {eta:.0f}s  (through id {last_id})")
+
+    chunks = read_chunks(state["last_vehicle_id"], chunk_size, stats)
+    if workers <= 0:
+        predictor = load_predictor(kwargs)
+        for last_id, seen, cars in chunks:
+            committed(last_id, seen, cars, predictor.predict_many(cars))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(kwargs,)) as executor:
+            # Results are written in submission order so the checkpoint only ever moves forward
+            in_flight = deque()
+            for last_id, seen, cars in chunks:
+                in_flight.append((last_id, seen, cars, executor.submit(_worker_score, cars)))
+                if len(in_flight) >= workers * 2:
+                    last, n, pending_cars, future = in_flight.popleft()
+                    committed(last, n, pending_cars, future.result())
+            while in_flight:
+                last, n, pending_cars, future = in_flight.popleft()
+                committed(last, n, pending_cars, future.result())
+
+    elapsed = time.perf_counter() - started
+    state["finished"] = True
+    save_checkpoint(checkpoint, state)
+    log(f"Scored {scored} of {done} vehicles in {elapsed:.1f}s ({done / elapsed if elapsed > 0 else 0:.0f}/s); "
+        f"skipped {stats['skipped']} without engine_size, "
+        f"{stats['no_service_history']} had no service history")
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score every vehicle into prediction history")
+    # The parent reads and writes the database, so leave it a core
+    parser.add_argument("--workers", type=int, default=max(0, (os.cpu_count() or 1) - 1),
+                        help="scoring processes (0 scores in this process)")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start a new run")
+    args = parser.parse_args()
+    run(args.workers, args.chunk_size, args.checkpoint, args.restart)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import os
+import joblib
+import numpy as np
+
+FORMAT_VERSION = 1
+LEAF = -1
+
+
+class CompiledForest:
+    """A fitted RandomForestClassifier flattened into contiguous arrays.
+
+    Every tree's nodes are laid out back to back; ``left``/``right`` hold
+    global node indices and leaves point at themselves so a batch can be
+    walked in lock-step until every (tree, row) pair sits on a leaf.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+
+        # Children interleaved as [right, left] so the comparison result
+        # indexes straight into them; leaf features clamped to a valid column
+        self._children = np.empty(2 * len(feature), dtype=np.int32)
+        self._children[0::2] = right
+        self._children[1::2] = left
+        self._safe_feature = np.maximum(feature, 0).astype(np.int32)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (
+            self.feature, self.threshold, self.left, self.right, self.value, self.roots,
+            self._children, self._safe_feature,
+        ))
+
+    def apply(self, X):
+        """Leaf index reached in every tree, shape (n_trees, n_rows)."""
+        # sklearn evaluates trees on float32 input against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        feature, threshold, children = self._safe_feature, self.threshold, self._children
+
+        # One slot per (tree, row) pair, tree-major
+        leaves = np.repeat(self.roots, n_rows)
+        positions = np.arange(len(leaves))
+        offsets = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, self.n_estimators)
+        nodes = leaves
+
+        while len(nodes):
+            go_left = flat_X[offsets + feature[nodes]] <= threshold[nodes]
+            nodes = children[2 * nodes + go_left]
+            leaves[positions] = nodes
+
+            # Keep walking only the pairs that have not reached a leaf yet
+            active = self.feature[nodes] != LEAF
+            if not active.all():
+                nodes, positions, offsets = nodes[active], positions[active], offsets[active]
+
+        return leaves.reshape(self.n_estimators, n_rows)
+
+    def predict_proba(self, X, chunk_size=4096):
+        X = np.asarray(X)
+        out = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            out[start:start + chunk_size] = self.value[leaves].mean(axis=0, dtype=np.float64)
+        return out
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def node_depths(self):
+        depth = np.full(len(self.feature), -1, dtype=np.int32)
+        frontier = self.roots.astype(np.int64)
+        level = 0
+        while len(frontier):
+            depth[frontier] = level
+            internal = frontier[self.feature[frontier] != LEAF]
+            frontier = np.concatenate([self.left[internal], self.right[internal]]).astype(np.int64)
+            level += 1
+        return depth
+
+    def prune(self, n_estimators=None, max_depth=None, value_dtype=None):
+        """Smaller serving variant: first ``n_estimators`` trees, depth capped
+        at ``max_depth`` (cut nodes predict their training class mix) and
+        node probabilities optionally stored as ``value_dtype``."""
+        n_trees = self.n_estimators if n_estimators is None else min(n_estimators, self.n_estimators)
+        end = self.roots[n_trees] if n_trees < self.n_estimators else len(self.feature)
+
+        feature = self.feature[:end].copy()
+        left = self.left[:end].astype(np.int64)
+        right = self.right[:end].astype(np.int64)
+        keep = np.ones(end, dtype=bool)
+
+        if max_depth is not None:
+            depth = self.node_depths()[:end]
+            keep = (depth >= 0) & (depth <= max_depth)
+            cut = keep & (depth == max_depth) & (feature != LEAF)
+            feature[cut] = LEAF
+            left[cut] = right[cut] = np.nonzero(cut)[0]
+
+        # Renumber the surviving nodes contiguously
+        new_index = np.cumsum(keep) - 1
+        value = self.value[:end][keep]
+        return CompiledForest(
+            feature=feature[keep],
+            threshold=self.threshold[:end][keep],
+            left=new_index[left[keep]].astype(np.int32),
+            right=new_index[right[keep]].astype(np.int32),
+            value=value.astype(value_dtype) if value_dtype is not None else value,
+            roots=new_index[self.roots[:n_trees]].astype(np.int32),
+            classes=self.classes_,
+        )
+
+    def save(self, path):
+        np.savez(
+            path,
+            format_version=np.array(FORMAT_VERSION),
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["format_version"])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported compiled forest format {version} in {path}")
+            return cls(
+                feature=data["feature"],
+                threshold=data["threshold"],
+                left=data["left"],
+                right=data["right"],
+                value=data["value"],
+                roots=data["roots"],
+                classes=data["classes"],
+            )
+
+
+def compile_forest(model):
+    """Flatten a fitted single-output RandomForestClassifier."""
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        is_leaf = tree.children_left == -1
+        own_index = np.arange(offset, offset + n_nodes)
+
+        features.append(np.where(is_leaf, LEAF, tree.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+        rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+
+        # Per-node class probabilities, normalised the way predict_proba does
+        value = tree.value[:, 0, :].astype(np.float64)
+        total = value.sum(axis=1, keepdims=True)
+        total[total == 0] = 1.0
+        values.append(value / total)
+
+        roots.append(offset)
+        offset += n_nodes
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+    )
+
+
+def load_model(path):
+    """Load either a compiled forest (.npz) or a joblib-pickled estimator."""
+    if os.path.splitext(path)[1] == ".npz":
+        return CompiledForest.load(path)
+    return joblib.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile model.pkl into the array-backed format")
+    parser.add_argument("model", help="joblib-pickled RandomForestClassifier")
+    parser.add_argument("output", help="destination .npz file")
+    args = parser.parse_args()
+
+    forest = compile_forest(joblib.load(args.model))
+    forest.save(args.output)
+    print(f"Compiled {forest.n_estimators} trees ({len(forest.feature)} nodes) into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+from functools import partial
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.batching import MicroBatcher
+from app.cache import PredictionCache
+from app.inference_pool import InferencePool, InferenceOverloaded
+from app.registry import ModelRegistry, DEFAULT_REGISTRY_DIR, ML_DIR
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+PREDICT_MICROBATCH = os.getenv("PREDICT_MICROBATCH", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "5"))
+
+# "thread" scores on the shared threadpool, "process" on a dedicated pool
+PREDICT_EXECUTOR = os.getenv("PREDICT_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "0")) or None
+
+make_prediction_cache = (
+    partial(PredictionCache, max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+    if PREDICTION_CACHE_SIZE > 0 else None
+)
+
+registry_kwargs = dict(
+    root=os.getenv("MODEL_REGISTRY_DIR", DEFAULT_REGISTRY_DIR),
+    legacy_model_path=os.getenv("MODEL_PATH", os.path.join(ML_DIR, "model.pkl")),
+    cache_factory=make_prediction_cache,
+)
+
+pool = (
+    InferencePool(registry_kwargs, workers=INFERENCE_WORKERS, max_queue_depth=INFERENCE_QUEUE_DEPTH)
+    if PREDICT_EXECUTOR == "process" else None
+)
+
+# In process mode the workers hold the models; the parent only tracks the
+# active version and warms every worker before switching to a new one
+registry = ModelRegistry(
+    **registry_kwargs,
+    poll_interval=float(os.getenv("MODEL_POLL_INTERVAL", "30")),
+    shadow_sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0")),
+    load_active=pool is None,
+    before_activate=pool.preload if pool is not None else None,
+)
+
+
+def predict_one(car):
+    predictor = registry.active
+    result = predictor.predict(car)
+    registry.shadow([car], [result])
+    return result
+
+
+def predict_many(cars):
+    predictor = registry.active
+    results = predictor.predict_many(cars)
+    registry.shadow(cars, results)
+    return results
+
+
+async def predict_batch(cars):
+    """Score a list of cars through the configured executor.
+
+    Raises InferenceOverloaded when the process pool's queue is full.
+    """
+    if pool is None:
+        return await run_in_threadpool(predict_many, cars)
+    results = await pool.score(registry.active.version, cars)
+    registry.shadow(cars, results)
+    return results
+
+
+batcher = (
+    MicroBatcher(
+        predict_batch if pool is not None else predict_many,
+        max_batch_size=MICROBATCH_MAX_SIZE,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+        # Enough windows in flight to keep every worker busy
+        max_concurrent_batches=INFERENCE_WORKERS if pool is not None else 2,
+    )
+    if PREDICT_MICROBATCH else None
+)
+
+
+async def predict(car):
+    """Score one car through whichever execution mode is configured."""
+    if batcher is not None:
+        return await batcher.submit(car)
+    if pool is not None:
+        return (await predict_batch([car]))[0]
+    return await run_in_threadpool(predict_one, car)
+
+
+def overloaded(e: InferenceOverloaded):
+    return HTTPException(
+        status_code=503,
+        detail="Prediction service is overloaded, retry later",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def startup():
+    if pool is not None:
+        await run_in_threadpool(pool.start, registry.desired_active_version())
+    registry.start()
+    if batcher is not None:
+        await batcher.start()
+
+
+async def shutdown():
+    if batcher is not None:
+        await batcher.stop()
+    if pool is not None:
+        await run_in_threadpool(pool.stop)
+    registry.stop()
+
+
+def status():
+    status = registry.status()
+    if batcher is not None:
+        status["microbatch"] = batcher.stats()
+    if pool is not None:
+        status["inference_pool"] = pool.stats()
+    return status
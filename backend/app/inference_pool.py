@@ -0,0 +1,204 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.registry import ModelRegistry
+
+# Per-process state inside pool workers
+_worker_registry = None
+_worker_predictors = {}  # version -> ServicePredictor, oldest first
+_worker_lock = threading.Lock()
+
+# Versions a worker keeps loaded: the one serving and the one being warmed
+WORKER_KEEP_VERSIONS = 2
+
+
+def _init_worker(registry_kwargs, version, control_queues, slot_counter, acks):
+    global _worker_registry
+    _worker_registry = ModelRegistry(**registry_kwargs)
+    _worker_predictor(version)
+
+    # Each worker owns one control queue; the parent broadcasts preloads on them
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+    threading.Thread(
+        target=_control_loop, args=(control_queues[slot], acks), name="preload", daemon=True
+    ).start()
+    acks.put((os.getpid(), version, None))
+
+
+def _control_loop(control, acks):
+    while True:
+        version = control.get()
+        if version is None:
+            return
+        # Loads next to the scoring thread, so this worker keeps serving meanwhile
+        try:
+            _worker_predictor(version)
+            acks.put((os.getpid(), version, None))
+        except Exception as e:
+            acks.put((os.getpid(), version, f"{type(e).__name__}: {e}"))
+
+
+def _worker_predictor(version):
+    with _worker_lock:
+        predictor = _worker_predictors.get(version)
+    if predictor is not None:
+        return predictor
+
+    predictor = _worker_registry.load_version(version)
+    with _worker_lock:
+        predictor = _worker_predictors.setdefault(version, predictor)
+        while len(_worker_predictors) > WORKER_KEEP_VERSIONS:
+            _worker_predictors.pop(next(iter(_worker_predictors)))
+    return predictor
+
+
+def _worker_score(version, cars, submitted_at):
+    started_at = time.time()
+    results = _worker_predictor(version).predict_many(cars)
+    return results, started_at - submitted_at, time.time() - started_at
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+class InferenceOverloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferencePool:
+    """Dedicated worker processes for model scoring, off the shared threadpool.
+
+    Each worker holds its own preloaded ServicePredictor; ``preload`` warms a
+    new version in every worker before the parent starts routing to it, so
+    hot swaps never load a model on the request path. Submissions beyond
+    ``max_queue_depth`` outstanding jobs are rejected immediately with
+    InferenceOverloaded so callers can shed load instead of queueing.
+    """
+
+    def __init__(self, registry_kwargs, workers=2, max_queue_depth=None):
+        self.registry_kwargs = registry_kwargs
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth or workers * 4
+        self._executor = None
+        self._control_queues = []
+        self._acks = None
+        self._lock = threading.Lock()
+        self.pending = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.errors = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.service_time_total = 0.0
+
+    def start(self, version, timeout=120.0):
+        context = multiprocessing.get_context("spawn")
+        self._control_queues = [context.Queue() for _ in range(self.workers)]
+        self._acks = context.Queue()
+        # spawn, not fork: the parent has live threads (registry poller, anyio)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.registry_kwargs, version, self._control_queues,
+                      context.Value("i", 0), self._acks),
+        )
+        # Start every worker and load its model before taking traffic
+        for future in [self._executor.submit(_worker_ready) for _ in range(self.workers)]:
+            future.result()
+        self._wait_for_acks(version, timeout)
+
+    def preload(self, version, timeout=120.0):
+        """Load ``version`` in every worker; raises if any of them fails."""
+        if self._executor is None:
+            return
+        for control in self._control_queues:
+            control.put(version)
+        self._wait_for_acks(version, timeout)
+
+    def _wait_for_acks(self, version, timeout):
+        deadline = time.monotonic() + timeout
+        ready = set()
+        while len(ready) < self.workers:
+            try:
+                pid, acked_version, error = self._acks.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"Workers did not load model version {version} within {timeout}s")
+            if acked_version != version:
+                continue  # late answer to an earlier preload
+            if error:
+                raise RuntimeError(f"Worker {pid} failed to load model version {version}: {error}")
+            ready.add(pid)
+
+    def stop(self):
+        for control in self._control_queues:
+            control.put(None)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._control_queues = []
+
+    def _retry_after(self):
+        if not self.completed:
+            return 1
+        mean_service = self.service_time_total / self.completed
+        return max(1, math.ceil(self.pending / self.workers * mean_service))
+
+    async def score(self, version, cars):
+        with self._lock:
+            if self.pending >= self.max_queue_depth:
+                self.rejected += 1
+                raise InferenceOverloaded(self._retry_after())
+            self.pending += 1
+            self.submitted += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            results, waited, service_time = await loop.run_in_executor(
+                self._executor, _worker_score, version, cars, time.time()
+            )
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+            self.service_time_total += service_time
+        return results
+
+    def stats(self):
+        with self._lock:
+            busy = min(self.pending, self.workers)
+            return {
+                "workers": self.workers,
+                "max_queue_depth": self.max_queue_depth,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "utilization": round(busy / self.workers, 3),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "errors": self.errors,
+                "mean_queue_wait_ms": round(self.queue_wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+                "max_queue_wait_ms": round(self.queue_wait_max * 1000, 3),
+                "mean_service_ms": round(self.service_time_total / self.completed * 1000, 3) if self.completed else 0.0,
+            }
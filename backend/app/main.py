@@ -1,14 +1,34 @@
+from contextlib import asynccontextmanager
+from typing import List
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app import models, database
+from app import inference, metrics, migrate, profiling
+from app.auth import password_hasher, principal_cache
 from app.schemas import CarData, PredictionResponse
-from app.predictor import ServicePredictor
-from app.routers import auth, users, vehicles, predictions, services, catalog
+from app.inference_pool import InferenceOverloaded
+from app.pagination import NEXT_CURSOR_HEADER
+from app.write_behind import history_writer
+from app.routers import auth, users, vehicles, predictions, services, catalog, profiles
 
-# Create tables
-models.Base.metadata.create_all(bind=database.engine)
+MAX_BATCH_SIZE = 10000
 
-app = FastAPI(title="Car Service Prediction API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if migrate.AUTO_MIGRATE:
+        migrate.upgrade()
+    # Load the active model before taking traffic, then watch for new versions
+    await inference.startup()
+    history_writer.start()
+    yield
+    await inference.shutdown()
+    # Durable flush of buffered prediction history before exit
+    history_writer.stop()
+    password_hasher.shutdown()
+
+
+app = FastAPI(title="Car Service Prediction API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,8 +36,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -25,8 +51,8 @@ app.include_router(vehicles.router)
 app.include_router(predictions.router)
 app.include_router(services.router)
 app.include_router(catalog.router)
-
-predictor = ServicePredictor()
+if profiling.PROFILING_ENABLED:
+    app.include_router(profiles.router)
 
 
 @app.get("/")
@@ -35,13 +61,56 @@ def root():
 
 
 @app.post("/predict", response_model=PredictionResponse)
-def predict_service(car: CarData):
+async def predict_service(car: CarData):
+    try:
+        return await inference.predict(car)
+    except InferenceOverloaded as e:
+        raise inference.overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/predict/batch", response_model=List[PredictionResponse])
+async def predict_service_batch(cars: List[CarData]):
+    if len(cars) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_BATCH_SIZE})"
+        )
     try:
-        return predictor.predict(car)
+        return await inference.predict_batch(cars)
+    except InferenceOverloaded as e:
+        raise inference.overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    status = {"status": "healthy", **inference.status()}
+    if principal_cache is not None:
+        status["auth_cache"] = principal_cache.stats()
+    status["password_pool"] = password_hasher.stats()
+    status["write_behind"] = history_writer.stats()
+    return status
+
+
+def component_stats():
+    status = inference.status()
+    components = {
+        "password_pool": password_hasher.stats(),
+        "write_behind": history_writer.stats(),
+    }
+    if principal_cache is not None:
+        components["auth_cache"] = principal_cache.stats()
+    for name in ("prediction_cache", "microbatch", "inference_pool"):
+        if name in status:
+            components[name] = status[name]
+    return components
+
+
+if metrics.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        # async so the threadpool limiter is read on the event loop
+        return PlainTextResponse(metrics.render(component_stats()), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,298 @@
+"""In-process metrics with a Prometheus text exposition at /metrics.
+
+Kept dependency-free: a handful of counters, gauges and fixed-bucket
+histograms, each guarded by its own lock. What gets measured:
+
+- every HTTP request, by method, route template and status (ASGI middleware)
+- requests in flight
+- get_current_user, split by principal-cache hit or miss
+- inference, split into preprocess, model (predict_proba) and rules
+- every SQL statement, plus per-request query counts and SQL time, via
+  engine cursor events and a context variable set by the middleware
+- threadpool saturation, read from anyio's default limiter at scrape time
+
+METRICS_ENABLED=0 leaves the middleware, the engine hooks and /metrics out
+entirely and skips the timing calls.
+In PREDICT_EXECUTOR=process mode inference runs in the worker processes,
+so the inference split is not collected; inference_pool_* covers it.
+"""
+import bisect
+import contextvars
+import math
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        lines = self.header()
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+http_requests = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.",
+    ("method", "route"), buckets=COUNT_BUCKETS,
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request.", ("method", "route"),
+)
+db_queries = Histogram(
+    "db_query_duration_seconds", "SQL statement latency by statement kind.", ("kind",),
+    buckets=FAST_BUCKETS + (0.25, 1.0),
+)
+auth_seconds = Histogram(
+    "auth_current_user_seconds", "get_current_user latency by principal-cache result.", ("cache",),
+    buckets=FAST_BUCKETS,
+)
+inference_seconds = Histogram(
+    "inference_stage_seconds", "Time per scoring call by stage (preprocess, model, rules).", ("stage",),
+    buckets=FAST_BUCKETS,
+)
+inference_cars = Counter("inference_cars_total", "Cars scored by the in-process predictor.")
+
+METRICS = [http_requests, http_in_flight, request_db_queries, request_db_seconds,
+           db_queries, auth_seconds, inference_seconds, inference_cars]
+
+
+def observe_inference(preprocess, model, rules, n_cars):
+    inference_seconds.observe(preprocess, "preprocess")
+    inference_seconds.observe(model, "model")
+    inference_seconds.observe(rules, "rules")
+    inference_cars.inc(n_cars)
+
+
+# Per-request SQL tally: [statements, seconds], set by the middleware.
+# Sync routes run in a copy of the request's context, so they add to the same list.
+_request_sql = contextvars.ContextVar("request_sql", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    elapsed = time.perf_counter() - started
+    kind = statement.lstrip()[:6].upper() or "OTHER"
+    if kind not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        kind = "OTHER"
+    db_queries.observe(elapsed, kind)
+    tally = _request_sql.get()
+    if tally is not None:
+        tally[0] += 1
+        tally[1] += elapsed
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("metrics_started"):
+        connection.info["metrics_started"].pop()
+
+
+def instrument_engine(engine):
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: no per-request task or body wrapping."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        tally = [0, 0.0]
+        token = _request_sql.set(tally)
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            _request_sql.reset(token)
+            # Route templates keep the label set bounded; unmatched paths share one label
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.observe(elapsed, method, path, str(status))
+            request_db_queries.observe(tally[0], method, path)
+            request_db_seconds.observe(tally[1], method, path)
+
+
+def threadpool_lines():
+    """Saturation of the threadpool sync routes and run_in_threadpool share."""
+    from anyio.to_thread import current_default_thread_limiter
+    from sniffio import AsyncLibraryNotFoundError
+
+    try:
+        limiter = current_default_thread_limiter()
+    except AsyncLibraryNotFoundError:
+        return []  # rendered outside the event loop (e.g. a script)
+    waiting = limiter.statistics().tasks_waiting
+    return [
+        "# HELP threadpool_threads_total Size of the shared threadpool.",
+        "# TYPE threadpool_threads_total gauge",
+        f"threadpool_threads_total {_format_value(limiter.total_tokens)}",
+        "# HELP threadpool_threads_busy Threadpool threads currently running work.",
+        "# TYPE threadpool_threads_busy gauge",
+        f"threadpool_threads_busy {limiter.borrowed_tokens}",
+        "# HELP threadpool_tasks_waiting Calls queued for a threadpool thread.",
+        "# TYPE threadpool_tasks_waiting gauge",
+        f"threadpool_tasks_waiting {waiting}",
+    ]
+
+
+def component_lines(components):
+    """Numeric fields of the /health component stats, as gauges named <component>_<field>."""
+    lines = []
+    for component, stats in components.items():
+        for field, value in sorted(stats.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{component}_{field}"
+            lines += [f"# TYPE {name} gauge", f"{name} {_format_value(value)}"]
+    return lines
+
+
+def render(components=None):
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += threadpool_lines()
+    lines += component_lines(components or {})
+    return "\n".join(lines) + "\n"
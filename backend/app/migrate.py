@@ -0,0 +1,42 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.database import engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Apply pending migrations when the API starts. Turn off when running several
+# workers and run `python -m app.migrate` (or `alembic upgrade head`) once instead.
+AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+
+# Revision matching the schema create_all used to build at import time
+BASELINE_REVISION = "0001"
+
+
+def alembic_config():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    # Leave the host application's logging alone
+    config.attributes["skip_logging"] = True
+    return config
+
+
+def upgrade(revision="head"):
+    """Bring the database up to ``revision``.
+
+    Databases created before migrations existed have the tables but no
+    alembic_version row; they are stamped at the baseline first so only
+    the newer revisions run against them.
+    """
+    config = alembic_config()
+    tables = set(inspect(engine).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.forest import CompiledForest, compile_forest, load_model
+from app.predictor import ServicePredictor
+
+# Get the directory where this script is located
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FEATURES = ["year", "mileage", "engine_size", "days_since_service"]
+
+
+def parse_depth(value):
+    return None if value.lower() == "none" else int(value)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build smaller serving variants of a trained forest and report the latency/accuracy Pareto front"
+    )
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "model.pkl"),
+                        help="model.pkl or compiled model.npz to shrink")
+    parser.add_argument("--scaler", default=os.path.join(BASE_DIR, "scaler.pkl"))
+    parser.add_argument("--dataset", default=os.path.join(BASE_DIR, "dataset_nepal.csv"))
+    parser.add_argument("--output-dir", default=os.path.join(BASE_DIR, "variants"),
+                        help="each variant is written as <output-dir>/<name>/{model.npz,scaler.pkl}")
+    parser.add_argument("--trees", type=int, nargs="+", default=[25, 50, 100, 200, 300])
+    parser.add_argument("--depths", type=parse_depth, nargs="+", default=[6, 8, 10, 12, 16, None],
+                        help="depth caps; 'none' keeps full depth")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="same split train_model.py holds out (stratified, --seed)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-calls", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    return parser.parse_args()
+
+
+class _Car:
+    def __init__(self, row):
+        self.year = int(row.year)
+        self.mileage = float(row.mileage)
+        self.engine_size = float(row.engine_size)
+        self.last_service_date = (pd.Timestamp.now().normalize()
+                                  - pd.Timedelta(days=int(row.days_since_service))).strftime("%Y-%m-%d")
+
+
+def variant_name(n_trees, max_depth, float32):
+    depth = "full" if max_depth is None else f"d{max_depth}"
+    return f"t{n_trees}_{depth}_{'f32' if float32 else 'f64'}"
+
+
+def measure(path, scaler_path, X_test, y_test, raw_test, latency_calls, batch_size):
+    start = time.perf_counter()
+    forest = CompiledForest.load(path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    proba = forest.predict_proba(X_test)[:, 1]
+
+    # Single-row latency through the real serving path
+    predictor = ServicePredictor(model_path=path, scaler_path=scaler_path)
+    samples = []
+    for i in range(latency_calls):
+        car = raw_test[i % len(raw_test)]
+        start = time.perf_counter()
+        predictor.predict(car)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    batch = raw_test[:batch_size]
+    start = time.perf_counter()
+    predictor.predict_many(batch)
+    batch_rows_per_s = len(batch) / (time.perf_counter() - start)
+
+    return {
+        "holdout_accuracy": round(float(accuracy_score(y_test, proba > 0.5)), 4),
+        "holdout_auc": round(float(roc_auc_score(y_test, proba)), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "batch_rows_per_s": round(batch_rows_per_s),
+        "memory_mb": round(forest.nbytes / 1e6, 2),
+        "file_mb": round(os.path.getsize(path) / 1e6, 2),
+        "load_ms": round(load_ms, 1),
+        "nodes": int(len(forest.feature)),
+    }
+
+
+def pareto_front(rows):
+    """Variants not beaten on both holdout accuracy and single-row p99."""
+    front = []
+    for row in rows:
+        dominated = any(
+            other["holdout_accuracy"] >= row["holdout_accuracy"]
+            and other["p99_ms"] <= row["p99_ms"]
+            and (other["holdout_accuracy"] > row["holdout_accuracy"] or other["p99_ms"] < row["p99_ms"])
+            for other in rows
+        )
+        if not dominated:
+            front.append(row["name"])
+    return front
+
+
+def main():
+    args = parse_args()
+
+    scaler = joblib.load(args.scaler)
+    base = load_model(args.model)
+    if not isinstance(base, CompiledForest):
+        base = compile_forest(base)
+
+    df = pd.read_csv(args.dataset)
+    _, test_df = train_test_split(df, test_size=args.holdout, random_state=args.seed, stratify=df["service_needed"])
+    X_test = scaler.transform(test_df[FEATURES])
+    y_test = test_df["service_needed"].to_numpy()
+    raw_test = [_Car(row) for row in test_df.itertuples()]
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    rows = []
+    trees = sorted({min(n, base.n_estimators) for n in args.trees})
+    for n_trees in trees:
+        for max_depth in args.depths:
+            for float32 in (False, True):
+                name = variant_name(n_trees, max_depth, float32)
+                variant = base.prune(
+                    n_estimators=n_trees,
+                    max_depth=max_depth,
+                    value_dtype=np.float32 if float32 else None,
+                )
+                variant_dir = os.path.join(args.output_dir, name)
+                os.makedirs(variant_dir, exist_ok=True)
+                model_path = os.path.join(variant_dir, "model.npz")
+                variant.save(model_path)
+                shutil.copy(args.scaler, os.path.join(variant_dir, "scaler.pkl"))
+
+                metrics = measure(model_path, args.scaler, X_test, y_test, raw_test,
+                                  args.latency_calls, args.batch_size)
+                rows.append({"name": name, "n_estimators": n_trees, "max_depth": max_depth,
+                             "float32": float32, **metrics})
+                print(f"measured {name}", flush=True)
+
+    front = set(pareto_front(rows))
+    print(f"\n{'variant':<18} {'acc':>6} {'auc':>6} {'p50_ms':>7} {'p99_ms':>7} {'batch/s':>9} "
+          f"{'mem_MB':>7} {'file_MB':>7} {'load_ms':>7}  pareto")
+    for row in sorted(rows, key=lambda r: r["p99_ms"]):
+        print(f"{row['name']:<18} {row['holdout_accuracy']:>6.4f} {row['holdout_auc']:>6.4f} "
+              f"{row['p50_ms']:>7.3f} {row['p99_ms']:>7.3f} {row['batch_rows_per_s']:>9,} "
+              f"{row['memory_mb']:>7.2f} {row['file_mb']:>7.2f} {row['load_ms']:>7.1f}  "
+              f"{'*' if row['name'] in front else ''}")
+
+    report_path = os.path.join(args.output_dir, "pareto_report.json")
+    with open(report_path, "w") as f:
+        json.dump({"source_model": os.path.abspath(args.model), "pareto_front": sorted(front),
+                   "variants": rows}, f, indent=2)
+    print(f"\nReport written to {report_path}. Copy a variant directory into ml/models/ to serve it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -33,7 +33,7 @@ class VehicleModel(Base):
     __tablename__ = "vehicle_models"
 
     id = Column(Integer, primary_key=True, index=True)
-    make_id = Column(Integer, ForeignKey("vehicle_makes.id"), nullable=False)
+    make_id = Column(Integer, ForeignKey("vehicle_makes.id"), nullable=False, index=True)
     name = Column(String, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -45,7 +45,7 @@ class Vehicle(Base):
     __tablename__ = "vehicles"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     make = Column(String, nullable=False)
     model = Column(String, nullable=False)
     year = Column(Integer, nullable=False)
@@ -66,10 +66,15 @@ class Vehicle(Base):
 
 class PredictionHistory(Base):
     __tablename__ = "prediction_history"
+    __table_args__ = (
+        # /predictions/history: newest first per user, optionally per vehicle
+        Index("ix_prediction_history_user_created", "user_id", "created_at"),
+        Index("ix_prediction_history_user_vehicle_created", "user_id", "vehicle_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True, index=True)  # vehicle delete cascade
     
     # Car details at time of prediction
     make = Column(String)
@@ -97,10 +102,15 @@ class PredictionHistory(Base):
 
 class ServiceRecord(Base):
     __tablename__ = "service_records"
+    __table_args__ = (
+        # /services/: newest first per user, optionally per vehicle
+        Index("ix_service_records_user_date", "user_id", "service_date"),
+        Index("ix_service_records_user_vehicle_date", "user_id", "vehicle_id", "service_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True, index=True)  # vehicle delete cascade
     
     service_type = Column(String, nullable=False)
     service_date = Column(DateTime, nullable=False)
@@ -112,3 +122,26 @@ class ServiceRecord(Base):
     # Relationships
     user = relationship("User", back_populates="services")
     vehicle = relationship("Vehicle", back_populates="services")
+
+
+class UserStats(Base):
+    """Per-user dashboard counters, kept current by app.stats on every write."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_predictions = Column(Integer, nullable=False, default=0)
+    total_vehicles = Column(Integer, nullable=False, default=0)
+    total_services = Column(Integer, nullable=False, default=0)
+    upcoming_services = Column(Integer, nullable=False, default=0)
+
+
+class UserMonthlyStats(Base):
+    __tablename__ = "user_monthly_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(String(7), primary_key=True)  # "YYYY-MM" of created_at (UTC)
+    predictions = Column(Integer, nullable=False, default=0)
+
+
+# Registers the mapper events that keep UserStats current
+from app import stats  # noqa: E402,F401
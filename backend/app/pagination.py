@@ -0,0 +1,59 @@
+"""Keyset pagination for the list endpoints.
+
+Pages are ordered on a unique key (e.g. created_at, id). The next page
+starts strictly after the last row returned, so deep pages cost the same
+as the first one and rows inserted between requests are neither repeated
+nor skipped. The key of the last row is handed back as an opaque cursor in
+the X-Next-Cursor response header; it is absent on the last page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, literal, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, response, order_by, limit, cursor=None, skip=0, descending=True):
+    """Apply ``order_by`` (a unique key, id last) and return one page.
+
+    ``cursor`` takes precedence over the legacy ``skip`` offset. Sets the
+    next-page cursor header on ``response`` when more rows remain.
+    """
+    if cursor:
+        key = tuple_(*order_by)
+        after = tuple_(*(literal(v, c.type) for c, v in zip(order_by, decode_cursor(cursor, order_by))))
+        query = query.filter(key < after if descending else key > after)
+
+    query = query.order_by(*(c.desc() if descending else c.asc() for c in order_by))
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more and rows:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], c.key) for c in order_by)
+    return rows
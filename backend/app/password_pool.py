@@ -0,0 +1,124 @@
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PasswordWorkRejected(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordPoolOverloaded(PasswordWorkRejected):
+    """Too many hashes queued overall."""
+
+
+class TooManyPasswordAttempts(PasswordWorkRejected):
+    """This account or client already has its share of hashes in flight."""
+
+
+class PasswordHasher:
+    """Bounded executor for bcrypt work, off the event loop and the shared threadpool.
+
+    bcrypt releases the GIL, so a few threads give real parallelism. At most
+    ``max_pending`` operations may be queued or running, and each admission
+    key (account, client IP) at most ``per_key_limit`` of them; beyond that
+    callers are rejected at once instead of queueing behind a login storm.
+    """
+
+    def __init__(self, hash_fn, verify_fn, workers=2, max_pending=None, per_key_limit=2):
+        self.hash_fn = hash_fn
+        self.verify_fn = verify_fn
+        self.workers = workers
+        self.max_pending = max_pending or workers * 8
+        self.per_key_limit = per_key_limit
+        self._executor = None
+        self._lock = threading.Lock()
+        self._by_key = Counter()
+        self.pending = 0
+
+        self.completed = 0
+        self.rejected_overloaded = 0
+        self.rejected_per_key = 0
+        self.queue_wait_total = 0.0
+        self.service_time_total = 0.0
+
+    async def hash(self, password, keys=()):
+        return await self._run(self.hash_fn, (password,), keys)
+
+    async def verify(self, password, hashed_password, keys=()):
+        return await self._run(self.verify_fn, (password, hashed_password), keys)
+
+    def _retry_after(self):
+        if not self.completed:
+            return 1
+        mean_service = self.service_time_total / self.completed
+        return max(1, math.ceil(self.pending / self.workers * mean_service))
+
+    def _admit(self, keys):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected_overloaded += 1
+                raise PasswordPoolOverloaded("Too many password operations queued", self._retry_after())
+            if any(self._by_key[key] >= self.per_key_limit for key in keys):
+                self.rejected_per_key += 1
+                raise TooManyPasswordAttempts("Too many concurrent attempts", self._retry_after())
+            self.pending += 1
+            for key in keys:
+                self._by_key[key] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _release(self, keys):
+        with self._lock:
+            self.pending -= 1
+            for key in keys:
+                self._by_key[key] -= 1
+                if self._by_key[key] <= 0:
+                    del self._by_key[key]
+
+    def _timed(self, fn, args, submitted_at):
+        started_at = time.perf_counter()
+        result = fn(*args)
+        return result, started_at - submitted_at, time.perf_counter() - started_at
+
+    async def _run(self, fn, args, keys):
+        keys = [key for key in keys if key]
+        executor = self._admit(keys)
+        try:
+            loop = asyncio.get_running_loop()
+            result, waited, service_time = await loop.run_in_executor(
+                executor, self._timed, fn, args, time.perf_counter()
+            )
+        finally:
+            self._release(keys)
+
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += waited
+            self.service_time_total += service_time
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "per_key_limit": self.per_key_limit,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected_overloaded": self.rejected_overloaded,
+                "rejected_per_key": self.rejected_per_key,
+                "mean_queue_wait_ms": round(self.queue_wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+                "mean_service_ms": round(self.service_time_total / self.completed * 1000, 3) if self.completed else 0.0,
+            }
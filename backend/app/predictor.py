@@ -1,41 +1,97 @@
+import threading
+import time
 import joblib
 import numpy as np
-import pandas as pd
 from datetime import datetime
+from app import metrics
+from app.forest import load_model
+
+FEATURES = ["year", "mileage", "engine_size", "days_since_service"]
+
 
 class ServicePredictor:
-    def __init__(self):
-        self.model = joblib.load("ml/model.pkl")
-        self.scaler = joblib.load("ml/scaler.pkl")
+    def __init__(self, model_path="ml/model.pkl", scaler_path="ml/scaler.pkl", cache=None, version=None):
+        self.version = version
+        # model_path may be the joblib pickle or a compiled .npz forest
+        self.model = load_model(model_path)
+        self.scaler = joblib.load(scaler_path)
 
-    def preprocess(self, data):
-        df = pd.DataFrame([{
-            "year": data.year,
-            "mileage": data.mileage,
-            "engine_size": data.engine_size,
-            "days_since_service": (datetime.now() - datetime.strptime(data.last_service_date, "%Y-%m-%d")).days
-        }])
+        # Apply the fitted StandardScaler directly instead of going through
+        # transform() and its DataFrame / feature-name validation
+        n_features = len(FEATURES)
+        mean = getattr(self.scaler, "mean_", None)
+        scale = getattr(self.scaler, "scale_", None)
+        self._mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+        self._scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        # One reusable feature row per thread
+        self._local = threading.local()
+
+        # Optional PredictionCache; it is tied to this model instance
+        self.cache = cache
+
+    def _row(self):
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(FEATURES)), dtype=np.float64)
+        return row
+
+    @staticmethod
+    def days_since_service(last_service_date, now=None):
+        now = now or datetime.now()
+        return (now - datetime.strptime(last_service_date, "%Y-%m-%d")).days
+
+    def _features(self, data, days_since):
+        row = self._row()
+        row[0, 0] = data.year
+        row[0, 1] = data.mileage
+        row[0, 2] = data.engine_size
+        row[0, 3] = days_since
 
         # Scale numerical features
-        scaled = self.scaler.transform(df)
-        return scaled
+        row -= self._mean
+        row /= self._scale
+        return row
+
+    def preprocess(self, data):
+        days_since = self.days_since_service(data.last_service_date)
+        return self._features(data, days_since).copy()
 
     def predict(self, data):
-        X = self.preprocess(data)
+        days_since = self.days_since_service(data.last_service_date)
+
+        if self.cache is not None:
+            key = self.cache.make_key(data, days_since)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        t0 = time.perf_counter()
+        X = self._features(data, days_since)
+        t1 = time.perf_counter()
         prob = self.model.predict_proba(X)[0][1]  # probability service needed
+        t2 = time.perf_counter()
+        result = self._result(prob, data.mileage, days_since)
+        if metrics.METRICS_ENABLED:
+            metrics.observe_inference(t1 - t0, t2 - t1, time.perf_counter() - t2, 1)
+
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _result(self, prob, mileage, days_since):
         service_needed = prob > 0.55
 
         # Recommendation logic
         recommended = []
-        days_since = (datetime.now() - datetime.strptime(data.last_service_date, "%Y-%m-%d")).days
 
-        if data.mileage % 10000 < 1500:
+        if mileage % 10000 < 1500:
             recommended.append("Oil Change")
 
         if days_since > 180:
             recommended.append("Routine Inspection")
 
-        if data.mileage > 120000:
+        if mileage > 120000:
             recommended.append("Transmission Check")
 
         if not recommended:
@@ -44,12 +100,103 @@ class ServicePredictor:
         # Risk level
         risk_level = "High" if prob > 0.75 else "Medium" if prob > 0.50 else "Low"
 
-        estimated_days =  max(0, int(200 - days_since))
+        estimated_days = max(0, int(200 - days_since))
 
         return {
-            "service_needed": service_needed,
+            "service_needed": bool(service_needed),
             "confidence": round(float(prob), 2),
             "estimated_days_until_service": estimated_days,
             "recommended_services": recommended,
-            "risk_level": risk_level
+            "risk_level": risk_level,
+            "model_version": self.version
         }
+
+    def preprocess_many(self, cars, now=None):
+        now = now or datetime.now()
+        days_since = np.array([
+            self.days_since_service(car.last_service_date, now) for car in cars
+        ], dtype=np.int64)
+        return self._features_many(cars, days_since)
+
+    def _features_many(self, cars, days_since):
+        # One feature matrix and one scaling pass for the whole batch
+        days_since = np.asarray(days_since, dtype=np.int64)
+        X = np.empty((len(cars), len(FEATURES)), dtype=np.float64)
+        X[:, 0] = [car.year for car in cars]
+        X[:, 1] = [car.mileage for car in cars]
+        X[:, 2] = [car.engine_size for car in cars]
+        X[:, 3] = days_since
+        mileage = X[:, 1].copy()
+
+        X -= self._mean
+        X /= self._scale
+        return X, mileage, days_since
+
+    def predict_many(self, cars):
+        if not cars:
+            return []
+
+        now = datetime.now()
+        days_since = np.array([
+            self.days_since_service(car.last_service_date, now) for car in cars
+        ], dtype=np.int64)
+
+        if self.cache is None:
+            return self._score_many(cars, days_since)
+
+        # Serve what we can from the cache and score only the misses
+        results = [None] * len(cars)
+        keys = [self.cache.make_key(car, days) for car, days in zip(cars, days_since)]
+        missing = []
+        for i, key in enumerate(keys):
+            results[i] = self.cache.get(key)
+            if results[i] is None:
+                missing.append(i)
+
+        if missing:
+            scored = self._score_many([cars[i] for i in missing], days_since[missing])
+            for i, result in zip(missing, scored):
+                self.cache.put(keys[i], result)
+                results[i] = result
+
+        return results
+
+    def _score_many(self, cars, days_since):
+        t0 = time.perf_counter()
+        X, mileage, days_since = self._features_many(cars, days_since)
+        t1 = time.perf_counter()
+        probs = self.model.predict_proba(X)[:, 1]
+        t2 = time.perf_counter()
+
+        # Same rules as predict(), evaluated column-wise
+        service_needed = probs > 0.55
+        oil_change = mileage % 10000 < 1500
+        inspection = days_since > 180
+        transmission = mileage > 120000
+        risk_levels = np.where(probs > 0.75, "High", np.where(probs > 0.50, "Medium", "Low"))
+        estimated_days = np.maximum(0, 200 - days_since)
+
+        results = []
+        for i in range(len(cars)):
+            recommended = []
+            if oil_change[i]:
+                recommended.append("Oil Change")
+            if inspection[i]:
+                recommended.append("Routine Inspection")
+            if transmission[i]:
+                recommended.append("Transmission Check")
+            if not recommended:
+                recommended.append("No immediate service required")
+
+            results.append({
+                "service_needed": bool(service_needed[i]),
+                "confidence": round(float(probs[i]), 2),
+                "estimated_days_until_service": int(estimated_days[i]),
+                "recommended_services": recommended,
+                "risk_level": str(risk_levels[i]),
+                "model_version": self.version
+            })
+
+        if metrics.METRICS_ENABLED:
+            metrics.observe_inference(t1 - t0, t2 - t1, time.perf_counter() - t2, len(cars))
+        return results
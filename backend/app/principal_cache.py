@@ -0,0 +1,131 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What authenticated routes need to know about the caller, detached from any session."""
+    id: int
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU of verified bearer tokens -> Principal.
+
+    Entries are keyed by a SHA-256 of the token (raw tokens are never kept)
+    and live for ``ttl_seconds`` but never past the token's own ``exp``.
+    ``invalidate_user`` drops every token of a user; it is called on user
+    updates and deletes in this process, so other worker processes can serve
+    a stale principal for at most ``ttl_seconds``.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, principal)
+        self._keys_by_user = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    @staticmethod
+    def make_key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, principal = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, key, principal, token_exp=None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, principal)
+            self._keys_by_user[principal.id].add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, ())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key):
+        _, principal = self._entries.pop(key)
+        keys = self._keys_by_user.get(principal.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[principal.id]
+
+    def record_latency(self, hit, seconds):
+        with self._lock:
+            if hit:
+                self.hit_seconds += seconds
+            else:
+                self.miss_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "mean_hit_ms": round(self.hit_seconds / self.hits * 1000, 3) if self.hits else 0.0,
+                "mean_miss_ms": round(self.miss_seconds / self.misses * 1000, 3) if self.misses else 0.0,
+                "saved_ms_total": round(
+                    (self.miss_seconds / self.misses - self.hit_seconds / self.hits) * self.hits * 1000, 1
+                ) if self.hits and self.misses else 0.0,
+            }
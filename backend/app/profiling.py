@@ -0,0 +1,302 @@
+"""Opt-in per-request profiling: stack samples, every SQL statement, N+1 hints.
+
+A request is profiled when it carries ``X-Profile: 1`` with a superuser's
+bearer token (checked with the same dependencies the routes use), or
+when it falls in the PROFILE_SAMPLE_RATE fraction. While it runs, a
+sampler thread snapshots the stacks of every busy thread every
+PROFILE_INTERVAL_MS, and engine hooks record each SQL statement with its
+duration. Statement shapes repeated PROFILE_REPEAT_THRESHOLD or more
+times are flagged as suspected N+1 patterns.
+
+Reports are kept in memory per worker process (the last
+PROFILE_STORE_SIZE) and served from GET /profiles/{id}; profiled
+responses carry the id in X-Profile-Id. The samples are process-wide, so
+under concurrency other requests' stacks show up too.
+
+With PROFILING_ENABLED unset the middleware, the hooks and the /profiles
+routes are not installed at all.
+"""
+import contextvars
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from fastapi import HTTPException
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_REPEAT_THRESHOLD = int(os.getenv("PROFILE_REPEAT_THRESHOLD", "5"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "100"))
+PROFILE_MAX_STATEMENTS = int(os.getenv("PROFILE_MAX_STATEMENTS", "500"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Leaf frames in these modules mean the thread is parked, not working
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+_TOP = 25
+
+
+class Sampler:
+    """Collects stack samples of all busy threads on a background thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me or frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    # Thread bootstrap frames are in every stack and say nothing
+                    if not frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                        stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def report(self):
+        own, cumulative = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack):
+                cumulative[name] += count
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "top_self": [{"function": name, "samples": n} for name, n in own.most_common(_TOP)],
+            "top_cumulative": [{"function": name, "samples": n} for name, n in cumulative.most_common(_TOP)],
+            "stacks": [
+                {"stack": ";".join(stack), "samples": n} for stack, n in self.stacks.most_common(_TOP)
+            ],
+        }
+
+
+_frame_names = {}
+
+
+def _frame_name(code):
+    name = _frame_names.get(code)
+    if name is None:
+        parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+        name = _frame_names[code] = f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+    return name
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """Collapse literals, parameter lists and whitespace so repeats compare equal."""
+    shape = _LITERALS.sub("?", statement)
+    shape = _IN_LISTS.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class ProfileSession:
+    def __init__(self, reason):
+        self.reason = reason
+        self.statements = []
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.shapes = {}  # shape -> [count, seconds]
+        self.sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+
+    def record_sql(self, statement, elapsed):
+        self.sql_count += 1
+        self.sql_seconds += elapsed
+        shape = statement_shape(statement)
+        totals = self.shapes.setdefault(shape, [0, 0.0])
+        totals[0] += 1
+        totals[1] += elapsed
+        if len(self.statements) < PROFILE_MAX_STATEMENTS:
+            self.statements.append({"statement": statement, "duration_ms": round(elapsed * 1000, 3)})
+
+    def report(self, report_id, scope, status, started_at, elapsed):
+        route = scope.get("route")
+        repeated = sorted(
+            ((shape, n, seconds) for shape, (n, seconds) in self.shapes.items() if n >= PROFILE_REPEAT_THRESHOLD),
+            key=lambda item: -item[1],
+        )
+        return {
+            "id": report_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status": status,
+            "reason": self.reason,
+            "started_at": started_at.isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "sql": {
+                "count": self.sql_count,
+                "total_ms": round(self.sql_seconds * 1000, 3),
+                "statements": self.statements,
+                "statements_truncated": self.sql_count > len(self.statements),
+            },
+            "n_plus_one": [
+                {"statement": shape, "count": n, "total_ms": round(seconds * 1000, 3)}
+                for shape, n, seconds in repeated
+            ],
+            "profile": self.sampler.report(),
+        }
+
+
+class ProfileStore:
+    def __init__(self, max_size=PROFILE_STORE_SIZE):
+        self.max_size = max_size
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, report):
+        with self._lock:
+            self._reports[report["id"]] = report
+            while len(self._reports) > self.max_size:
+                self._reports.popitem(last=False)
+
+    def get(self, report_id):
+        with self._lock:
+            return self._reports.get(report_id)
+
+    def summaries(self):
+        with self._lock:
+            reports = list(self._reports.values())
+        return [
+            {
+                "id": r["id"], "method": r["method"], "path": r["path"], "status": r["status"],
+                "reason": r["reason"], "started_at": r["started_at"], "duration_ms": r["duration_ms"],
+                "sql_count": r["sql"]["count"], "n_plus_one": len(r["n_plus_one"]),
+            }
+            for r in reversed(reports)
+        ]
+
+
+store = ProfileStore()
+
+_session = contextvars.ContextVar("profile_session", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _session.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = _session.get()
+    if session is not None and conn.info.get("profile_started"):
+        session.record_sql(statement, time.perf_counter() - conn.info["profile_started"].pop())
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("profile_started"):
+        connection.info["profile_started"].pop()
+
+
+def instrument_engine(engine):
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+async def is_superuser(authorization):
+    """Run the routes' own auth dependencies against a raw Authorization header."""
+    from jose import JWTError, jwt
+    from starlette.concurrency import run_in_threadpool
+
+    from app import auth, database
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    # Garbage tokens are turned away before anything touches the database
+    try:
+        jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    except JWTError:
+        return False
+    try:
+        if database.DB_ASYNC:
+            async with database.AsyncSessionLocal() as db:
+                user = await auth.get_current_user(token, db)
+        else:
+            # The sync lookup itself runs in the threadpool (auth.get_user_by_email)
+            db = await run_in_threadpool(database.SessionLocal)
+            try:
+                user = await auth.get_current_user(token, db)
+            finally:
+                await run_in_threadpool(db.close)
+        await auth.get_current_active_superuser(await auth.get_current_active_user(user))
+    except HTTPException:
+        return False
+    return True
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def _reason(self, scope):
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER.encode()) == b"1":
+            if await is_superuser(headers.get(b"authorization", b"").decode("latin-1")):
+                return "header"
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/profiles"):
+            return await self.app(scope, receive, send)
+        reason = await self._reason(scope)
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        session = ProfileSession(reason)
+        # The id goes out with the response headers, before the report exists
+        report_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [
+                    *message.get("headers", []), (PROFILE_ID_HEADER.encode(), report_id.encode()),
+                ]}
+            await send(message)
+
+        token = _session.set(session)
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        session.sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            session.sampler.stop()
+            _session.reset(token)
+            store.add(session.report(report_id, scope, status, started_at, elapsed))
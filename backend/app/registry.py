@@ -0,0 +1,349 @@
+import argparse
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+
+from app.predictor import ServicePredictor
+
+logger = logging.getLogger(__name__)
+
+ML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml")
+DEFAULT_REGISTRY_DIR = os.path.join(ML_DIR, "models")
+LEGACY_VERSION = "legacy"
+ACTIVE_FILE = "ACTIVE"
+CANDIDATE_FILE = "CANDIDATE"
+
+
+@dataclass
+class _WarmupCar:
+    make: str = "Toyota"
+    model: str = "Corolla"
+    year: int = 2015
+    mileage: float = 60000.0
+    last_service_date: str = date.today().isoformat()
+    engine_size: float = 1.5
+    transmission: str = "Manual"
+    fuel_type: str = "Petrol"
+
+
+class ShadowStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset(None)
+
+    def reset(self, candidate_version):
+        with self._lock:
+            self.candidate_version = candidate_version
+            self.scored = 0
+            self.skipped = 0
+            self.errors = 0
+            self.label_disagreements = 0
+            self.risk_disagreements = 0
+            self.abs_diff_sum = 0.0
+            self.max_abs_diff = 0.0
+
+    def record(self, active_results, shadow_results):
+        with self._lock:
+            for active, shadow in zip(active_results, shadow_results):
+                diff = abs(active["confidence"] - shadow["confidence"])
+                self.scored += 1
+                self.abs_diff_sum += diff
+                self.max_abs_diff = max(self.max_abs_diff, diff)
+                self.label_disagreements += active["service_needed"] != shadow["service_needed"]
+                self.risk_disagreements += active["risk_level"] != shadow["risk_level"]
+
+    def record_skip(self, count):
+        with self._lock:
+            self.skipped += count
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "candidate_version": self.candidate_version,
+                "scored": self.scored,
+                "skipped": self.skipped,
+                "errors": self.errors,
+                "mean_abs_confidence_diff": round(self.abs_diff_sum / self.scored, 4) if self.scored else 0.0,
+                "max_abs_confidence_diff": round(self.max_abs_diff, 4),
+                "label_disagreements": self.label_disagreements,
+                "risk_disagreements": self.risk_disagreements,
+            }
+
+
+class ActiveVersion:
+    """Stands in for the active predictor when the registry doesn't load models."""
+
+    cache = None
+
+    def __init__(self, version):
+        self.version = version
+
+
+class ModelRegistry:
+    """Versioned model artifacts with hot reload and optional shadow scoring.
+
+    Layout under ``root``::
+
+        <root>/<version>/model.npz (or model.pkl)
+        <root>/<version>/scaler.pkl
+        <root>/ACTIVE       name of the version to serve
+        <root>/CANDIDATE    optional version to shadow-score
+
+    Without ACTIVE the lexically newest version is served; with no versions
+    at all the legacy ``ml/model.pkl`` / ``ml/scaler.pkl`` pair is used.
+    A background thread polls the pointer files, loads and warms a new
+    version off the request path and then swaps a single reference, so
+    in-flight requests finish on the model they started with.
+
+    When scoring happens elsewhere (e.g. the process pool), pass
+    ``load_active=False`` to track only the active version name, and
+    ``before_activate`` to warm the scorers before each swap; an exception
+    from it keeps the current version.
+    """
+
+    def __init__(
+        self,
+        root=DEFAULT_REGISTRY_DIR,
+        legacy_model_path=os.path.join(ML_DIR, "model.pkl"),
+        legacy_scaler_path=os.path.join(ML_DIR, "scaler.pkl"),
+        poll_interval=30.0,
+        shadow_sample_rate=0.0,
+        cache_factory=None,
+        load_active=True,
+        before_activate=None,
+    ):
+        self.root = root
+        self.legacy_model_path = legacy_model_path
+        self.legacy_scaler_path = legacy_scaler_path
+        self.poll_interval = poll_interval
+        self.shadow_sample_rate = shadow_sample_rate
+        self.cache_factory = cache_factory
+        self.load_active = load_active
+        self.before_activate = before_activate
+
+        self._active = None
+        self._candidate = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._shadow_pending = threading.BoundedSemaphore(32)
+        self.shadow_stats = ShadowStats()
+        self.last_error = None
+
+    # Version discovery
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def _read_pointer(self, name):
+        path = os.path.join(self.root, name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip() or None
+
+    def desired_active_version(self):
+        pinned = self._read_pointer(ACTIVE_FILE)
+        if pinned:
+            return pinned
+        versions = self.versions()
+        return versions[-1] if versions else LEGACY_VERSION
+
+    def desired_candidate_version(self):
+        return self._read_pointer(CANDIDATE_FILE)
+
+    def artifact_paths(self, version):
+        if version == LEGACY_VERSION:
+            return self.legacy_model_path, self.legacy_scaler_path
+
+        version_dir = os.path.join(self.root, version)
+        model_path = os.path.join(version_dir, "model.npz")
+        if not os.path.exists(model_path):
+            model_path = os.path.join(version_dir, "model.pkl")
+        return model_path, os.path.join(version_dir, "scaler.pkl")
+
+    # Loading and swapping
+
+    def load_version(self, version, with_cache=True):
+        model_path, scaler_path = self.artifact_paths(version)
+        cache = self.cache_factory() if with_cache and self.cache_factory else None
+        predictor = ServicePredictor(
+            model_path=model_path,
+            scaler_path=scaler_path,
+            cache=cache,
+            version=version,
+        )
+        # Score once so the first real request doesn't pay for lazy setup
+        warmup = _WarmupCar()
+        predictor._score_many([warmup], [predictor.days_since_service(warmup.last_service_date)])
+        return predictor
+
+    def _activate(self, version):
+        if self.before_activate is not None:
+            self.before_activate(version)
+        if not self.load_active:
+            return ActiveVersion(version)
+        return self.load_version(version)
+
+    @property
+    def active(self):
+        predictor = self._active
+        if predictor is None:
+            with self._lock:
+                if self._active is None:
+                    self._active = self._activate(self.desired_active_version())
+                predictor = self._active
+        return predictor
+
+    @property
+    def candidate(self):
+        return self._candidate
+
+    def refresh(self):
+        """Load and swap in whatever the pointer files ask for."""
+        try:
+            wanted = self.desired_active_version()
+            current = self._active
+            if current is None or current.version != wanted:
+                predictor = self._activate(wanted)
+                with self._lock:
+                    self._active = predictor
+                logger.info("Activated model version %s", wanted)
+
+            wanted_candidate = self.desired_candidate_version()
+            if wanted_candidate == wanted:
+                wanted_candidate = None
+            current_candidate = self._candidate
+            current_version = current_candidate.version if current_candidate else None
+            if wanted_candidate != current_version:
+                candidate = self.load_version(wanted_candidate, with_cache=False) if wanted_candidate else None
+                with self._lock:
+                    self._candidate = candidate
+                self.shadow_stats.reset(wanted_candidate)
+                logger.info("Shadow candidate set to %s", wanted_candidate)
+            self.last_error = None
+        except Exception as e:
+            # Keep serving the current model if the new one is broken
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.exception("Model refresh failed")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._shadow_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    # Shadow scoring
+
+    def shadow(self, cars, active_results):
+        """Queue a sampled copy of this traffic for the candidate model."""
+        candidate = self._candidate
+        if candidate is None or self.shadow_sample_rate <= 0:
+            return
+        if random.random() >= self.shadow_sample_rate:
+            return
+        if not self._shadow_pending.acquire(blocking=False):
+            # Never let shadow work queue up behind live traffic
+            self.shadow_stats.record_skip(len(cars))
+            return
+        self._shadow_executor.submit(self._score_shadow, candidate, list(cars), active_results)
+
+    def _score_shadow(self, candidate, cars, active_results):
+        try:
+            if candidate is not self._candidate:
+                return
+            self.shadow_stats.record(active_results, candidate.predict_many(cars))
+        except Exception:
+            self.shadow_stats.record_error()
+            logger.exception("Shadow scoring failed")
+        finally:
+            self._shadow_pending.release()
+
+    def status(self):
+        active = self._active
+        status = {
+            "model_version": active.version if active else None,
+            "available_versions": self.versions(),
+        }
+        if self._candidate is not None:
+            status["shadow"] = self.shadow_stats.snapshot()
+        if active is not None and active.cache is not None:
+            status["prediction_cache"] = active.cache.stats()
+        if self.last_error:
+            status["last_reload_error"] = self.last_error
+        return status
+
+
+def _write_pointer(path, version):
+    # Write-then-rename so the poller never reads a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts")
+    parser.add_argument("--root", default=os.getenv("MODEL_REGISTRY_DIR", DEFAULT_REGISTRY_DIR))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list versions and pointers")
+    activate = sub.add_parser("activate", help="serve a version")
+    activate.add_argument("version")
+    candidate = sub.add_parser("candidate", help="shadow-score a version (omit to clear)")
+    candidate.add_argument("version", nargs="?")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(root=args.root)
+    if args.command == "list":
+        active = registry.desired_active_version()
+        candidate_version = registry.desired_candidate_version()
+        for version in registry.versions() or [LEGACY_VERSION]:
+            marker = " (active)" if version == active else " (candidate)" if version == candidate_version else ""
+            print(f"{version}{marker}")
+    elif args.command == "activate":
+        if args.version not in registry.versions():
+            parser.error(f"unknown version {args.version!r}")
+        _write_pointer(os.path.join(args.root, ACTIVE_FILE), args.version)
+        print(f"Workers will switch to {args.version} on their next poll")
+    elif args.command == "candidate":
+        path = os.path.join(args.root, CANDIDATE_FILE)
+        if args.version is None:
+            if os.path.exists(path):
+                os.remove(path)
+            print("Shadow candidate cleared")
+        else:
+            if args.version not in registry.versions():
+                parser.error(f"unknown version {args.version!r}")
+            _write_pointer(path, args.version)
+            print(f"Workers will shadow-score {args.version} on their next poll")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,45 @@
 from datetime import timedelta
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import auth, models, schemas
+from app.password_pool import PasswordPoolOverloaded, PasswordWorkRejected
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+def client_key(request: Request):
+    return f"ip:{request.client.host}" if request.client else None
+
+
+def rejected(e: PasswordWorkRejected):
+    return HTTPException(
+        status_code=503 if isinstance(e, PasswordPoolOverloaded) else 429,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(auth.get_db)
+    db: Session = Depends(auth.get_auth_db)
 ):
-    user = db.query(models.User).filter(
-        models.User.email == form_data.username
-    ).first()
+    user = await auth.get_user_by_email(db, form_data.username)
+
+    verified = False
+    if user:
+        try:
+            verified = await auth.password_hasher.verify(
+                form_data.password, user.hashed_password,
+                keys=(f"account:{user.id}", client_key(request)),
+            )
+        except PasswordWorkRejected as e:
+            raise rejected(e)
 
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -34,18 +56,22 @@ async def login_for_access_token(
 
 
 @router.post("/register", response_model=schemas.UserResponse)
-def register_user(
+async def register_user(
+    request: Request,
     user: schemas.UserCreate,
-    db: Session = Depends(auth.get_db)
+    db: Session = Depends(auth.get_auth_db)
 ):
     if len(user.password) > 72:
         raise HTTPException(status_code=400, detail="Password too long (max 72)")
 
-    existing = db.query(models.User).filter(models.User.email == user.email).first()
+    existing = await auth.get_user_by_email(db, user.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = auth.get_password_hash(user.password)
+    try:
+        hashed_password = await auth.password_hasher.hash(user.password, keys=(client_key(request),))
+    except PasswordWorkRejected as e:
+        raise rejected(e)
 
     new_user = models.User(
         email=user.email,
@@ -53,11 +79,7 @@ def register_user(
         is_active=True,
         is_superuser=False
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-
-    return new_user
+    return await auth.add_user(db, new_user)
 
 
 @router.get("/me", response_model=schemas.UserResponse)
@@ -1,17 +1,23 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app import auth, models, schemas
+from app.catalog_cache import etag_matches, snapshot
 
 router = APIRouter(prefix="/catalog", tags=["catalog"])
 
 # Public endpoints - anyone can view the catalog
 @router.get("/makes", response_model=List[schemas.VehicleMakeWithModels])
 def list_makes(
+    request: Request,
     db: Session = Depends(auth.get_db),
 ):
-    makes = db.query(models.VehicleMake).all()
-    return makes
+    body, etag = snapshot.get(db)
+    # no-cache: clients may store it but must revalidate with If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/makes/{make_id}/models", response_model=List[schemas.VehicleModelResponse])
 def list_models_for_make(
@@ -40,6 +46,7 @@ def create_make(
     db_make = models.VehicleMake(**make.dict())
     db.add(db_make)
     db.commit()
+    snapshot.invalidate()
     db.refresh(db_make)
     return db_make
 
@@ -67,6 +74,7 @@ def create_model(
     db_model = models.VehicleModel(**model.dict())
     db.add(db_model)
     db.commit()
+    snapshot.invalidate()
     db.refresh(db_model)
     return db_model
 
@@ -84,6 +92,7 @@ def delete_make(
     
     db.delete(make)
     db.commit()
+    snapshot.invalidate()
     return {"message": "Make deleted successfully"}
 
 @router.delete("/models/{model_id}")
@@ -100,4 +109,5 @@ def delete_model(
     
     db.delete(model)
     db.commit()
+    snapshot.invalidate()
     return {"message": "Model deleted successfully"}
@@ -1,9 +1,14 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import datetime, timedelta
-from app import auth, models, schemas
+from starlette.concurrency import run_in_threadpool
+from app import auth, database, inference, models, schemas, stats
+from app.export import export_response, export_scope
+from app.inference_pool import InferenceOverloaded
+from app.pagination import paginate
+from app.write_behind import WriteBehindFull, history_writer, prediction_row
 
 router = APIRouter(prefix="/predictions", tags=["predictions"])
 
@@ -22,10 +27,50 @@ def save_prediction(
     db.refresh(db_prediction)
     return db_prediction
 
+async def owns_vehicle(db, user_id, vehicle_id):
+    stmt = select(models.Vehicle.id).where(models.Vehicle.user_id == user_id, models.Vehicle.id == vehicle_id)
+    if database.DB_ASYNC:
+        return (await db.execute(stmt)).first() is not None
+    return await run_in_threadpool(lambda: db.execute(stmt).first() is not None)
+
+@router.post("/predict", response_model=schemas.PredictionResponse)
+async def predict_and_save(
+    car: schemas.PredictAndSaveRequest,
+    db: Session = Depends(auth.get_auth_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Score a car and record it in the caller's history in one round trip.
+
+    The history row is written behind: it shows up in /predictions/history
+    within WRITE_BEHIND_MAX_DELAY_MS, not necessarily before this returns.
+    """
+    # Checked here: a bad id in the buffer would only fail at flush time, detached from this request
+    if car.vehicle_id is not None and not await owns_vehicle(db, current_user.id, car.vehicle_id):
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
+    try:
+        result = await inference.predict(car)
+    except InferenceOverloaded as e:
+        raise inference.overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        history_writer.add(prediction_row(current_user.id, car, result, vehicle_id=car.vehicle_id))
+    except WriteBehindFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Prediction history is backed up, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return result
+
 @router.get("/history", response_model=List[schemas.PredictionHistoryResponse])
 def get_prediction_history(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     vehicle_id: int = Query(None),
     db: Session = Depends(auth.get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -37,56 +82,35 @@ def get_prediction_history(
     if vehicle_id:
         query = query.filter(models.PredictionHistory.vehicle_id == vehicle_id)
     
-    predictions = query.order_by(
-        models.PredictionHistory.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    return predictions
+    return paginate(
+        query, response,
+        order_by=[models.PredictionHistory.created_at, models.PredictionHistory.id],
+        limit=limit, cursor=cursor, skip=skip,
+    )
+
+@router.get("/export")
+def export_prediction_history(
+    format: str = "ndjson",
+    vehicle_id: int = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    all_users: bool = False,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Stream history as NDJSON or CSV; superusers may export another user or everyone."""
+    return export_response(
+        models.PredictionHistory, schemas.PredictionHistoryResponse, models.PredictionHistory.created_at,
+        format, owner_id=export_scope(current_user, user_id, all_users),
+        vehicle_id=vehicle_id, start=start, end=end,
+    )
 
 @router.get("/stats", response_model=schemas.UserStatistics)
 def get_user_statistics(
     db: Session = Depends(auth.get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
-    # Total predictions
-    total_predictions = db.query(func.count(models.PredictionHistory.id)).filter(
-        models.PredictionHistory.user_id == current_user.id
-    ).scalar()
-    
-    # Total vehicles
-    total_vehicles = db.query(func.count(models.Vehicle.id)).filter(
-        models.Vehicle.user_id == current_user.id
-    ).scalar()
-    
-    # Total services
-    total_services = db.query(func.count(models.ServiceRecord.id)).filter(
-        models.ServiceRecord.user_id == current_user.id
-    ).scalar()
-    
-    # Predictions this month
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    predictions_this_month = db.query(func.count(models.PredictionHistory.id)).filter(
-        models.PredictionHistory.user_id == current_user.id,
-        extract('month', models.PredictionHistory.created_at) == current_month,
-        extract('year', models.PredictionHistory.created_at) == current_year
-    ).scalar()
-    
-    # Upcoming services (predictions with service needed in next 30 days)
-    upcoming_services = db.query(func.count(models.PredictionHistory.id)).filter(
-        models.PredictionHistory.user_id == current_user.id,
-        models.PredictionHistory.service_needed == True,
-        models.PredictionHistory.estimated_days_until_service <= 30,
-        models.PredictionHistory.estimated_days_until_service >= 0
-    ).scalar()
-    
-    return schemas.UserStatistics(
-        total_predictions=total_predictions or 0,
-        total_vehicles=total_vehicles or 0,
-        total_services=total_services or 0,
-        predictions_this_month=predictions_this_month or 0,
-        upcoming_services=upcoming_services or 0
-    )
+    return schemas.UserStatistics(**stats.get_user_stats(db, current_user.id))
 
 @router.get("/{prediction_id}", response_model=schemas.PredictionHistoryResponse)
 def get_prediction(
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app import auth, models
+from app.profiling import store
+
+router = APIRouter(prefix="/profiles", tags=["profiling"])
+
+
+@router.get("/")
+def list_profiles(
+    current_user: models.User = Depends(auth.get_current_active_superuser),
+):
+    return store.summaries()
+
+
+@router.get("/{profile_id}")
+def get_profile(
+    profile_id: str,
+    current_user: models.User = Depends(auth.get_current_active_superuser),
+):
+    report = store.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
@@ -1,7 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app import auth, models, schemas
+from app.bulk_import import ServiceRecordImporter, run_import
+from app.export import export_response, export_scope
+from app.pagination import paginate
 
 router = APIRouter(prefix="/services", tags=["services"])
 
@@ -20,10 +24,20 @@ def create_service_record(
     db.refresh(db_service)
     return db_service
 
+@router.post("/import", response_model=schemas.BulkImportResponse)
+async def import_service_records(
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Bulk-create service records from an NDJSON or CSV body (one row per line)."""
+    return await run_import(ServiceRecordImporter(current_user.id), request)
+
 @router.get("/", response_model=List[schemas.ServiceRecordResponse])
 def list_service_records(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     vehicle_id: int = Query(None),
     db: Session = Depends(auth.get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -35,11 +49,28 @@ def list_service_records(
     if vehicle_id:
         query = query.filter(models.ServiceRecord.vehicle_id == vehicle_id)
     
-    services = query.order_by(
-        models.ServiceRecord.service_date.desc()
-    ).offset(skip).limit(limit).all()
-    
-    return services
+    return paginate(
+        query, response,
+        order_by=[models.ServiceRecord.service_date, models.ServiceRecord.id],
+        limit=limit, cursor=cursor, skip=skip,
+    )
+
+@router.get("/export")
+def export_service_records(
+    format: str = "ndjson",
+    vehicle_id: int = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    all_users: bool = False,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Stream service records as NDJSON or CSV; superusers may export another user or everyone."""
+    return export_response(
+        models.ServiceRecord, schemas.ServiceRecordResponse, models.ServiceRecord.service_date,
+        format, owner_id=export_scope(current_user, user_id, all_users),
+        vehicle_id=vehicle_id, start=start, end=end,
+    )
 
 @router.get("/{service_id}", response_model=schemas.ServiceRecordResponse)
 def get_service_record(
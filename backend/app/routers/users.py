@@ -1,19 +1,23 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app import auth, models, schemas
+from app.pagination import paginate
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/", response_model=List[schemas.UserResponse])
 def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(auth.get_db),
     current_user: models.User = Depends(auth.get_current_active_superuser),
 ):
-    return db.query(models.User).offset(skip).limit(limit).all()
+    return paginate(db.query(models.User), response, order_by=[models.User.id],
+                    limit=limit, cursor=cursor, skip=skip, descending=False)
 
 
 @router.delete("/{user_id}", response_model=schemas.UserResponse)
@@ -1,7 +1,9 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app import auth, models, schemas
+from app.bulk_import import VehicleImporter, run_import
+from app.pagination import paginate
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
@@ -24,17 +26,28 @@ def create_vehicle(
     db.refresh(db_vehicle)
     return db_vehicle
 
+@router.post("/import", response_model=schemas.BulkImportResponse)
+async def import_vehicles(
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """Bulk-create vehicles from an NDJSON or CSV body (one row per line)."""
+    return await run_import(VehicleImporter(current_user.id), request)
+
 @router.get("/", response_model=List[schemas.VehicleResponse])
 def list_vehicles(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(auth.get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
-    vehicles = db.query(models.Vehicle).filter(
+    query = db.query(models.Vehicle).filter(
         models.Vehicle.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return vehicles
+    )
+    return paginate(query, response, order_by=[models.Vehicle.id],
+                    limit=limit, cursor=cursor, skip=skip, descending=False)
 
 @router.get("/{vehicle_id}", response_model=schemas.VehicleResponse)
 def get_vehicle(
@@ -34,12 +34,16 @@ class CarData(BaseModel):
     transmission: str
     fuel_type: str
 
+class PredictAndSaveRequest(CarData):
+    vehicle_id: Optional[int] = None
+
 class PredictionResponse(BaseModel):
     service_needed: bool
     confidence: float
     estimated_days_until_service: int
     recommended_services: List[str]
     risk_level: str
+    model_version: Optional[str] = None
 
 # Vehicle schemas
 class VehicleBase(BaseModel):
@@ -176,3 +180,16 @@ class VehicleMakeWithModels(VehicleMakeResponse):
 
     class Config:
         from_attributes = True
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class BulkImportResponse(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool
+    elapsed_seconds: float
+    rows_per_second: float
@@ -0,0 +1,256 @@
+"""Per-user dashboard counters.
+
+UserStats / UserMonthlyStats are bumped from mapper events in the same
+transaction as every ORM insert/delete of a prediction, vehicle or service,
+so /predictions/stats is two primary-key lookups however long a user's
+history is. Core bulk inserts bypass mapper events: build a StatsDelta for
+the rows and apply() it on the same connection.
+
+Rebuild the counters from the history tables with:
+    python -m app.stats rebuild [--user-id N]
+"""
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from sqlalchemy import and_, delete, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import models
+
+TOTAL_FIELDS = ("total_predictions", "total_vehicles", "total_services", "upcoming_services")
+
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+user_stats = models.UserStats.__table__
+monthly_stats = models.UserMonthlyStats.__table__
+
+
+def month_key(when):
+    return when.strftime("%Y-%m")
+
+
+def month_bounds(now):
+    start = datetime(now.year, now.month, 1)
+    end = datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+    return start, end
+
+
+def is_upcoming(service_needed, estimated_days_until_service):
+    days = estimated_days_until_service
+    return bool(service_needed) and days is not None and 0 <= days <= 30
+
+
+def upcoming_criteria():
+    return [
+        models.PredictionHistory.service_needed == True,  # noqa: E712
+        models.PredictionHistory.estimated_days_until_service <= 30,
+        models.PredictionHistory.estimated_days_until_service >= 0,
+    ]
+
+
+class StatsDelta:
+    """Counter changes accumulated in memory and written with one statement per table."""
+
+    def __init__(self):
+        self.totals = defaultdict(Counter)
+        self.monthly = Counter()
+
+    def add_prediction(self, user_id, created_at, service_needed, estimated_days_until_service, sign=1):
+        totals = self.totals[user_id]
+        totals["total_predictions"] += sign
+        if is_upcoming(service_needed, estimated_days_until_service):
+            totals["upcoming_services"] += sign
+        self.monthly[(user_id, month_key(created_at or datetime.utcnow()))] += sign
+
+    def add_vehicle(self, user_id, sign=1):
+        self.totals[user_id]["total_vehicles"] += sign
+
+    def add_service(self, user_id, sign=1):
+        self.totals[user_id]["total_services"] += sign
+
+    def apply(self, connection):
+        totals = [
+            {"user_id": user_id, **{field: counts.get(field, 0) for field in TOTAL_FIELDS}}
+            for user_id, counts in self.totals.items() if any(counts.values())
+        ]
+        monthly = [
+            {"user_id": user_id, "month": month, "predictions": n}
+            for (user_id, month), n in self.monthly.items() if n
+        ]
+        _bump(connection, user_stats, ["user_id"], TOTAL_FIELDS, totals)
+        _bump(connection, monthly_stats, ["user_id", "month"], ["predictions"], monthly)
+
+
+def _bump(connection, table, keys, fields, rows):
+    """Add each row's field values onto the existing counters, creating missing rows."""
+    if not rows:
+        return
+
+    make_insert = UPSERT_INSERTS.get(connection.dialect.name)
+    if make_insert is not None:
+        stmt = make_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={field: table.c[field] + stmt.excluded[field] for field in fields},
+        )
+        connection.execute(stmt, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(*(table.c[key] == row[key] for key in keys))
+            .values({field: table.c[field] + row[field] for field in fields})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+
+def _prediction_listener(sign):
+    def listener(mapper, connection, target):
+        delta = StatsDelta()
+        delta.add_prediction(target.user_id, target.created_at, target.service_needed,
+                             target.estimated_days_until_service, sign)
+        delta.apply(connection)
+    return listener
+
+
+def _vehicle_listener(sign):
+    def listener(mapper, connection, target):
+        delta = StatsDelta()
+        delta.add_vehicle(target.user_id, sign)
+        delta.apply(connection)
+    return listener
+
+
+def _service_listener(sign):
+    def listener(mapper, connection, target):
+        delta = StatsDelta()
+        delta.add_service(target.user_id, sign)
+        delta.apply(connection)
+    return listener
+
+
+for _event, _sign in (("after_insert", 1), ("after_delete", -1)):
+    event.listen(models.PredictionHistory, _event, _prediction_listener(_sign))
+    event.listen(models.Vehicle, _event, _vehicle_listener(_sign))
+    event.listen(models.ServiceRecord, _event, _service_listener(_sign))
+
+
+@event.listens_for(models.User, "before_delete")
+def _drop_user_stats(mapper, connection, target):
+    # Runs after the user's cascaded children were deleted (and decremented)
+    connection.execute(delete(user_stats).where(user_stats.c.user_id == target.id))
+    connection.execute(delete(monthly_stats).where(monthly_stats.c.user_id == target.id))
+
+
+def get_user_stats(db, user_id, now=None):
+    now = now or datetime.utcnow()
+    row = db.execute(
+        select(models.UserStats, models.UserMonthlyStats.predictions)
+        .outerjoin(models.UserMonthlyStats, and_(
+            models.UserMonthlyStats.user_id == models.UserStats.user_id,
+            models.UserMonthlyStats.month == month_key(now),
+        ))
+        .where(models.UserStats.user_id == user_id)
+    ).first()
+    if row is None:
+        # No counters yet (new user, or not rebuilt since the upgrade)
+        return aggregate_user_stats(db, user_id, now)
+
+    counters, this_month = row
+    return {
+        "total_predictions": counters.total_predictions,
+        "total_vehicles": counters.total_vehicles,
+        "total_services": counters.total_services,
+        "predictions_this_month": this_month or 0,
+        "upcoming_services": counters.upcoming_services,
+    }
+
+
+def aggregate_user_stats(db, user_id, now=None):
+    """The same numbers straight from the history tables, in one round trip."""
+    start, end = month_bounds(now or datetime.utcnow())
+    PredictionHistory = models.PredictionHistory
+
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(model.user_id == user_id, *criteria).scalar_subquery()
+
+    row = db.execute(select(
+        count(PredictionHistory).label("total_predictions"),
+        count(models.Vehicle).label("total_vehicles"),
+        count(models.ServiceRecord).label("total_services"),
+        # A range on created_at (not extract()) so the (user_id, created_at) index applies
+        count(PredictionHistory, PredictionHistory.created_at >= start,
+              PredictionHistory.created_at < end).label("predictions_this_month"),
+        count(PredictionHistory, *upcoming_criteria()).label("upcoming_services"),
+    )).one()
+    return dict(row._mapping)
+
+
+def month_expression(dialect, column):
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect == "mysql":
+        return func.date_format(column, "%Y-%m")
+    return func.strftime("%Y-%m", column)
+
+
+def rebuild(connection, user_id=None):
+    """Recompute counters from the history tables; returns the number of users written."""
+    def for_user(column):
+        return [column == user_id] if user_id is not None else []
+
+    connection.execute(delete(user_stats).where(*for_user(user_stats.c.user_id)))
+    connection.execute(delete(monthly_stats).where(*for_user(monthly_stats.c.user_id)))
+
+    totals = defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+    sources = (
+        ("total_predictions", models.PredictionHistory, []),
+        ("total_vehicles", models.Vehicle, []),
+        ("total_services", models.ServiceRecord, []),
+        ("upcoming_services", models.PredictionHistory, upcoming_criteria()),
+    )
+    for field, model, criteria in sources:
+        stmt = (
+            select(model.user_id, func.count())
+            .where(*criteria, *for_user(model.user_id))
+            .group_by(model.user_id)
+        )
+        for uid, n in connection.execute(stmt):
+            totals[uid][field] = n
+
+    if totals:
+        connection.execute(insert(user_stats), [{"user_id": uid, **counts} for uid, counts in totals.items()])
+
+    PredictionHistory = models.PredictionHistory
+    month = month_expression(connection.dialect.name, PredictionHistory.created_at)
+    monthly = connection.execute(
+        select(PredictionHistory.user_id, month, func.count())
+        .where(PredictionHistory.created_at.isnot(None), *for_user(PredictionHistory.user_id))
+        .group_by(PredictionHistory.user_id, month)
+    ).all()
+    if monthly:
+        connection.execute(insert(monthly_stats), [
+            {"user_id": uid, "month": m, "predictions": n} for uid, m, n in monthly
+        ])
+    return len(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the per-user statistics counters")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = sub.add_parser("rebuild", help="recompute counters from the history tables")
+    rebuild_parser.add_argument("--user-id", type=int, default=None, help="only this user (default: everyone)")
+    args = parser.parse_args()
+
+    from app.database import engine
+
+    with engine.begin() as connection:
+        users = rebuild(connection, args.user_id)
+    print(f"Rebuilt statistics for {users} user(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from app import models
+from app.database import engine
+from app.stats import StatsDelta
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+WRITE_BEHIND_MAX_DELAY_MS = float(os.getenv("WRITE_BEHIND_MAX_DELAY_MS", "50"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "20000"))
+
+
+class WriteBehindFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Write-behind buffer is full")
+        self.retry_after = retry_after
+
+
+class WriteBehindBuffer:
+    """Collect rows from many requests and write them in one transaction.
+
+    A flusher thread calls ``write_batch(rows)`` once ``max_batch`` rows are
+    waiting or ``max_delay_ms`` after the oldest one arrived. A batch that
+    fails with one of ``transient_errors`` (the DB is locked or unreachable)
+    is kept and retried; any other failure is retried row by row and the
+    rows the database still refuses are logged and dropped, so one bad row
+    can't hold up the rest. ``stop()`` flushes whatever is left before
+    returning. ``add`` never blocks: past ``max_pending`` rows it raises
+    WriteBehindFull.
+    """
+
+    def __init__(self, write_batch, max_batch=500, max_delay_ms=50.0, max_pending=20000, retry_delay=1.0,
+                 transient_errors=(OperationalError,)):
+        self.write_batch = write_batch
+        self.transient_errors = transient_errors
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+
+        self._rows = []
+        self._oldest_at = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+        self.added = 0
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.last_error = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+        # Anything the loop couldn't write (e.g. the DB was down) gets one last try
+        if self._rows:
+            self._flush(self._take(len(self._rows)))
+        if self._rows:
+            logger.error("Dropping %d unwritten rows at shutdown", len(self._rows))
+
+    def add(self, row):
+        with self._cond:
+            if len(self._rows) >= self.max_pending:
+                self.rejected += 1
+                raise WriteBehindFull(retry_after=max(1, round(self.retry_delay)))
+            first = not self._rows
+            if first:
+                self._oldest_at = time.monotonic()
+            self._rows.append(row)
+            self.added += 1
+            # Wake the flusher to start the delay clock, or to write a full batch now
+            if first or len(self._rows) >= self.max_batch:
+                self._cond.notify()
+
+    def _take(self, n):
+        with self._cond:
+            batch, self._rows = self._rows[:n], self._rows[n:]
+            self._oldest_at = time.monotonic() if self._rows else None
+        return batch
+
+    def _requeue(self, batch):
+        with self._cond:
+            self._rows[:0] = batch
+            self._oldest_at = time.monotonic()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if len(self._rows) >= self.max_batch:
+                        break
+                    if self._rows:
+                        remaining = self._oldest_at + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopping and not self._rows:
+                    return
+                stopping = self._stopping
+
+            if not self._flush(self._take(self.max_batch)):
+                if stopping:
+                    return
+                time.sleep(self.retry_delay)
+
+    def _flush(self, batch):
+        if not batch:
+            return True
+        started = time.perf_counter()
+        try:
+            self.write_batch(batch)
+            written = len(batch)
+        except self.transient_errors as e:
+            self._failed(e)
+            logger.exception("Write-behind flush of %d rows failed; will retry", len(batch))
+            self._requeue(batch)
+            return False
+        except Exception as e:
+            self._failed(e)
+            logger.warning("Write-behind flush of %d rows failed (%s); writing rows individually", len(batch), e)
+            written = 0
+            for i, row in enumerate(batch):
+                try:
+                    self.write_batch([row])
+                    written += 1
+                except self.transient_errors as e:
+                    self._failed(e)
+                    logger.exception("Write-behind row write failed; will retry %d rows", len(batch) - i)
+                    self._requeue(batch[i:])
+                    self._record(written, started)
+                    return False
+                except Exception as e:
+                    self._failed(e)
+                    with self._cond:
+                        self.dropped += 1
+                    logger.error("Dropping write-behind row the database rejected: %s; row: %r", e, row)
+
+        self._record(written, started)
+        return True
+
+    def _failed(self, e):
+        with self._cond:
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    def _record(self, written, started):
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self.flushes += 1
+            self.written += written
+            self.flush_seconds_total += elapsed
+            self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    def stats(self):
+        with self._cond:
+            status = {
+                "depth": len(self._rows),
+                "max_batch": self.max_batch,
+                "max_delay_ms": self.max_delay * 1000,
+                "max_pending": self.max_pending,
+                "added": self.added,
+                "written": self.written,
+                "flushes": self.flushes,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "dropped": self.dropped,
+                "mean_batch_size": round(self.written / self.flushes, 2) if self.flushes else 0.0,
+                "mean_flush_ms": round(self.flush_seconds_total / self.flushes * 1000, 3) if self.flushes else 0.0,
+                "max_flush_ms": round(self.flush_seconds_max * 1000, 3),
+            }
+            if self.last_error:
+                status["last_error"] = self.last_error
+            return status
+
+
+def prediction_row(user_id, car, result, vehicle_id=None, created_at=None):
+    return {
+        "user_id": user_id,
+        "vehicle_id": vehicle_id,
+        "make": car.make,
+        "model": car.model,
+        "year": car.year,
+        "mileage": car.mileage,
+        "last_service_date": car.last_service_date,
+        "engine_size": car.engine_size,
+        "transmission": car.transmission,
+        "fuel_type": car.fuel_type,
+        "service_needed": result["service_needed"],
+        "confidence": result["confidence"],
+        "estimated_days_until_service": result["estimated_days_until_service"],
+        "recommended_services": json.dumps(result["recommended_services"]),
+        "risk_level": result["risk_level"],
+        "created_at": created_at or datetime.utcnow(),
+    }
+
+
+def write_predictions(rows):
+    """One executemany INSERT plus the matching stats counters, in one transaction."""
+    delta = StatsDelta()
+    for row in rows:
+        delta.add_prediction(row["user_id"], row["created_at"], row["service_needed"],
+                             row["estimated_days_until_service"])
+    with engine.begin() as connection:
+        connection.execute(insert(models.PredictionHistory), rows)
+        delta.apply(connection)
+
+
+history_writer = WriteBehindBuffer(
+    write_predictions,
+    max_batch=WRITE_BEHIND_MAX_BATCH,
+    max_delay_ms=WRITE_BEHIND_MAX_DELAY_MS,
+    max_pending=WRITE_BEHIND_MAX_PENDING,
+)
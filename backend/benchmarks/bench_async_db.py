@@ -0,0 +1,108 @@
+"""Event-loop lag and latency of authenticated requests, sync vs async DB mode.
+
+Each mode runs in a fresh interpreter (DB_ASYNC is read at import) against
+the same seeded SQLite file. Clients hammer GET /auth/me, which resolves
+the user through get_current_user, while a probe task measures how late
+the event loop wakes it up.
+
+Run from the backend directory:
+    python -m benchmarks.bench_async_db --users 20000 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import BACKEND_DIR, percentile
+
+
+def seed(db_dir, n_users):
+    from sqlalchemy import create_engine, insert
+    from app import models
+
+    engine = create_engine(f"sqlite:///{os.path.join(db_dir, 'sql_app.db')}")
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x", "is_active": True, "is_superuser": False}
+            for i in range(n_users)
+        ])
+
+
+async def run_child(args):
+    import httpx
+    from app import auth
+    from app.main import app
+
+    tokens = [
+        auth.create_access_token({"sub": f"user{i * 7919 % args.users}@example.com"})
+        for i in range(args.concurrency)
+    ]
+    latencies, lags = [], []
+    deadline = time.perf_counter() + args.duration
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+    async def client(client_http, token):
+        headers = {"Authorization": f"Bearer {token}"}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client_http.get("/auth/me", headers=headers)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client_http:
+        start = time.perf_counter()
+        await asyncio.gather(probe(), *(client(client_http, t) for t in tokens))
+        elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "lag_p50_ms": percentile(lags, 50),
+        "lag_p99_ms": percentile(lags, 99),
+        "lag_max_ms": max(lags) if lags else 0.0,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="sync mode deadlocks above the pool size (15): blocking pool waits run on the loop")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child(args))
+        return
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        seed(db_dir, args.users)
+        print(f"{'mode':<8} {'req/s':>8} {'p50_ms':>8} {'p99_ms':>8} {'lag_p50':>8} {'lag_p99':>8} {'lag_max':>8}")
+        for mode, flag in (("sync", "0"), ("async", "1")):
+            env = {**os.environ, "DB_ASYNC": flag, "PYTHONPATH": BACKEND_DIR}
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_async_db", "--child",
+                 "--users", str(args.users), "--concurrency", str(args.concurrency),
+                 "--duration", str(args.duration)],
+                cwd=db_dir, env=env, check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(f"{mode:<8} {r['throughput']:>8,.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+                  f"{r['lag_p50_ms']:>8.2f} {r['lag_p99_ms']:>8.2f} {r['lag_max_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
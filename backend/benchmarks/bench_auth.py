@@ -0,0 +1,59 @@
+"""Authenticated read latency with and without the verified-token principal cache.
+
+Run from the backend directory:
+    python -m benchmarks.bench_auth --requests 2000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_auth_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import auth  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.principal_cache import PrincipalCache  # noqa: E402
+from benchmarks.common import percentile  # noqa: E402
+
+
+def run(client, headers, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.get("/vehicles/", headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"email": "bench@example.com", "password": "benchpass"})
+        token = client.post("/auth/token", data={"username": "bench@example.com", "password": "benchpass"})
+        headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+        print(f"{'mode':<14} {'p50_ms':>8} {'p99_ms':>8}")
+        for name, cache in (("no cache", None), ("cached", PrincipalCache())):
+            auth.principal_cache = cache
+            run(client, headers, 50)
+            p50, p99 = run(client, headers, args.requests)
+            print(f"{name:<14} {p50:>8.3f} {p99:>8.3f}")
+        print(auth.principal_cache.stats())
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Rows/sec of predict() in a loop vs predict_many() for a few batch sizes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_batch
+"""
+import argparse
+import time
+
+from benchmarks.common import load_predictor, random_cars
+
+
+def rows_per_second(fn, n_rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n_rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-limit", type=int, default=1000,
+                        help="cap on rows scored one at a time (the loop is slow)")
+    args = parser.parse_args()
+
+    predictor = load_predictor()
+    predictor.predict_many(random_cars(10))  # warm up
+
+    print(f"{'batch':>8} {'predict() rows/s':>18} {'predict_many() rows/s':>22} {'speedup':>8}")
+    for size in args.sizes:
+        cars = random_cars(size)
+        loop_cars = cars[:args.loop_limit]
+        single = rows_per_second(
+            lambda: [predictor.predict(car) for car in loop_cars],
+            len(loop_cars), args.repeat,
+        )
+        batch = rows_per_second(lambda: predictor.predict_many(cars), size, args.repeat)
+        print(f"{size:>8} {single:>18,.0f} {batch:>22,.0f} {batch / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
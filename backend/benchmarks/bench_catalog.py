@@ -0,0 +1,87 @@
+"""/catalog/makes: lazy-loaded ORM serialization vs the cached snapshot vs 304.
+
+Run from the backend directory:
+    python -m benchmarks.bench_catalog --makes 60 --models-per-make 15
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_catalog_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(*args):
+    global statements
+    statements += 1
+
+
+def seed(n_makes, models_per_make):
+    with engine.begin() as conn:
+        conn.execute(insert(models.VehicleMake), [{"name": f"Make {i}"} for i in range(n_makes)])
+        conn.execute(insert(models.VehicleModel), [
+            {"make_id": make_id, "name": f"Model {j}"}
+            for make_id in range(1, n_makes + 1) for j in range(models_per_make)
+        ])
+
+
+def lazy_list_makes():
+    """The endpoint before the snapshot: query, then one lazy load per make."""
+    with SessionLocal() as db:
+        makes = db.query(models.VehicleMake).all()
+        return [schemas.VehicleMakeWithModels.model_validate(m).model_dump(mode="json") for m in makes]
+
+
+def timed(fn, repeats):
+    global statements
+    statements = 0
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), statements / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--makes", type=int, default=60)
+    parser.add_argument("--models-per-make", type=int, default=15)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        seed(args.makes, args.models_per_make)
+        etag = client.get("/catalog/makes").headers["etag"]
+
+        cases = {
+            "lazy ORM (old, no HTTP)": lazy_list_makes,
+            "snapshot 200": lambda: client.get("/catalog/makes"),
+            "snapshot 304": lambda: client.get("/catalog/makes", headers={"If-None-Match": etag}),
+        }
+        print(f"{'case':<26} {'median_ms':>10} {'sql/request':>12}")
+        for name, fn in cases.items():
+            ms, sql = timed(fn, args.repeats)
+            print(f"{name:<26} {ms:>10.3f} {sql:>12.1f}")
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
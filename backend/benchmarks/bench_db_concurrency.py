@@ -0,0 +1,128 @@
+"""Mixed read/write SQLite throughput: default settings vs the production profile.
+
+Writer threads insert PredictionHistory and ServiceRecord rows (one
+commit each, like /predictions/save and /services/) while reader threads
+page through a user's history. Reports completed operations and
+"database is locked" failures per profile.
+
+Run from the backend directory:
+    python -m benchmarks.bench_db_concurrency --writers 8 --readers 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import build_engine
+from benchmarks.common import percentile
+
+N_USERS = 50
+
+
+def seed(engine, rows_per_user):
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x"} for i in range(N_USERS)
+        ])
+        conn.execute(insert(models.PredictionHistory), [
+            prediction_row(1 + i % N_USERS) for i in range(N_USERS * rows_per_user)
+        ])
+
+
+def prediction_row(user_id):
+    return dict(
+        user_id=user_id, make="Toyota", model="Corolla", year=2015, mileage=60000.0,
+        service_needed=True, confidence=0.8, estimated_days_until_service=10,
+        recommended_services='["Oil Change"]', risk_level="High", created_at=datetime.utcnow(),
+    )
+
+
+def run(profile, args, db_path):
+    engine = build_engine(f"sqlite:///{db_path}", sqlite_profile=profile)
+    seed(engine, args.rows_per_user)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "writes": 0, "locked": 0, "write_ms": [], "read_ms": []}
+
+    def writer():
+        rng = random.Random()
+        while not stop.is_set():
+            user_id = rng.randint(1, N_USERS)
+            start = time.perf_counter()
+            db = Session()
+            try:
+                if rng.random() < 0.5:
+                    db.add(models.PredictionHistory(**prediction_row(user_id)))
+                else:
+                    db.add(models.ServiceRecord(user_id=user_id, service_type="Oil Change",
+                                                service_date=datetime.utcnow(), cost=50.0))
+                db.commit()
+                with lock:
+                    stats["writes"] += 1
+                    stats["write_ms"].append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    stats["locked"] += 1
+            finally:
+                db.close()
+
+    def reader():
+        rng = random.Random()
+        while not stop.is_set():
+            start = time.perf_counter()
+            db = Session()
+            try:
+                db.query(models.PredictionHistory).filter(
+                    models.PredictionHistory.user_id == rng.randint(1, N_USERS)
+                ).order_by(models.PredictionHistory.created_at.desc()).limit(100).all()
+                with lock:
+                    stats["reads"] += 1
+                    stats["read_ms"].append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                with lock:
+                    stats["locked"] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    print(f"{profile:<11} {stats['writes'] / args.duration:>9,.0f} {stats['reads'] / args.duration:>9,.0f} "
+          f"{stats['locked']:>7} {percentile(stats['write_ms'], 99):>11.1f} {percentile(stats['read_ms'], 99):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rows-per-user", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'profile':<11} {'writes/s':>9} {'reads/s':>9} {'locked':>7} {'write_p99':>11} {'read_p99':>10}")
+    for profile in ("default", "production"):
+        with tempfile.TemporaryDirectory() as tmp:
+            run(profile, args, os.path.join(tmp, "bench.db"))
+
+
+if __name__ == "__main__":
+    main()
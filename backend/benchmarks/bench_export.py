@@ -0,0 +1,138 @@
+"""Pulling a user's full history: paging /predictions/history vs /predictions/export.
+
+Grows one user's history in steps. At each size it times reading every
+row by following the ?cursor= pages (limit 100, ORM + Pydantic per row)
+and by one NDJSON/CSV export through the app. It then drives the export
+generator directly to time the first chunk and to take the tracemalloc
+peak of a full export, which should not grow with the table. httpx's ASGI
+transport buffers whole responses, so those two are not taken through it.
+
+Run from the backend directory:
+    python -m benchmarks.bench_export --steps 100000 500000 2000000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_export_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import auth, migrate, models, schemas  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.export import export_response  # noqa: E402
+from app.main import app  # noqa: E402
+from app.pagination import NEXT_CURSOR_HEADER  # noqa: E402
+
+CHUNK = 50_000
+BASE_DATE = datetime(2020, 1, 1)
+
+
+def grow(start_count, target):
+    with engine.begin() as conn:
+        for offset in range(start_count, target, CHUNK):
+            conn.execute(insert(models.PredictionHistory), [
+                {
+                    "user_id": 1, "make": "Toyota", "model": "Corolla", "year": 2015, "mileage": 60000.0,
+                    "service_needed": True, "confidence": 0.8, "estimated_days_until_service": 10,
+                    "recommended_services": '["Oil Change"]', "risk_level": "High",
+                    "created_at": BASE_DATE + timedelta(seconds=30 * (offset + i)),
+                }
+                for i in range(min(CHUNK, target - offset))
+            ])
+
+
+async def page_through(client, headers):
+    rows, cursor = 0, None
+    while True:
+        params = {"limit": 100, **({"cursor": cursor} if cursor else {})}
+        r = await client.get("/predictions/history", params=params, headers=headers)
+        r.raise_for_status()
+        rows += len(r.json())
+        cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return rows
+
+
+async def export(client, headers, fmt):
+    r = await client.get("/predictions/export", params={"format": fmt}, headers=headers, timeout=None)
+    r.raise_for_status()
+    return r.content.count(b"\n") - (fmt == "csv")
+
+
+def body_iterator(fmt):
+    return export_response(models.PredictionHistory, schemas.PredictionHistoryResponse,
+                           models.PredictionHistory.created_at, fmt, owner_id=1).body_iterator
+
+
+async def first_chunk_ms(fmt):
+    start = time.perf_counter()
+    chunks = body_iterator(fmt)
+    await anext(chunks)
+    elapsed = time.perf_counter() - start
+    await chunks.aclose()
+    return elapsed * 1000
+
+
+async def traced_peak_mib(fmt):
+    tracemalloc.start()
+    size = 0
+    async for chunk in body_iterator(fmt):
+        size += len(chunk)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / 2**20, peak / 2**20
+
+
+async def run(steps):
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': 'bench@example.com'})}"}
+    transport = httpx.ASGITransport(app=app)
+    print(f"{'rows':>9} {'pages_s':>8} {'ndjson_s':>9} {'csv_s':>7} {'first_chunk_ms':>15} {'body_MiB':>9} {'peak_MiB':>9}")
+    count = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for target in steps:
+            grow(count, target)
+            count = target
+
+            start = time.perf_counter()
+            paged = await page_through(client, headers)
+            pages_s = time.perf_counter() - start
+            start = time.perf_counter()
+            exported = await export(client, headers, "ndjson")
+            ndjson_s = time.perf_counter() - start
+            start = time.perf_counter()
+            exported_csv = await export(client, headers, "csv")
+            csv_s = time.perf_counter() - start
+            assert paged == exported == exported_csv == count, (paged, exported, exported_csv, count)
+
+            first_ms = await first_chunk_ms("ndjson")
+            body_mib, peak_mib = await traced_peak_mib("ndjson")
+            print(f"{count:>9} {pages_s:>8.2f} {ndjson_s:>9.2f} {csv_s:>7.2f} {first_ms:>15.1f} "
+                  f"{body_mib:>9.1f} {peak_mib:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, nargs="+", default=[100_000, 500_000])
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "bench@example.com", "hashed_password": "x"}])
+    asyncio.run(run(sorted(args.steps)))
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Nightly fleet refresh: one car at a time vs python -m app.fleet.
+
+Seeds --vehicles vehicles with service history, then scores the fleet:
+  per-car   predictor.predict + one ORM insert and commit per vehicle
+            (what a client looping over /predict and /predictions/save does,
+            minus HTTP), on the first --per-car vehicles only
+  fleet     app.fleet.run with each --workers setting
+
+Run from the backend directory:
+    python -m benchmarks.bench_fleet --vehicles 100000 --workers 0 2 4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_fleet_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import fleet, migrate, models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from benchmarks.common import MAKES_MODELS  # noqa: E402
+
+USERS = 500
+
+
+def seed(n, rng):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x"} for i in range(USERS)
+        ])
+        for start in range(0, n, 50_000):
+            vehicles = []
+            for i in range(start, min(n, start + 50_000)):
+                make = rng.choice(list(MAKES_MODELS))
+                vehicles.append({
+                    "user_id": 1 + i % USERS, "make": make, "model": rng.choice(MAKES_MODELS[make]),
+                    "year": rng.randint(1998, 2023), "mileage": float(rng.randint(3000, 200000)),
+                    "engine_size": round(rng.uniform(0.8, 2.4), 1),
+                })
+            conn.execute(insert(models.Vehicle), vehicles)
+            conn.execute(insert(models.ServiceRecord), [
+                {
+                    "user_id": 1 + i % USERS, "vehicle_id": 1 + i, "service_type": "Oil Change",
+                    "service_date": datetime(2023, 1, 1) + timedelta(days=rng.randint(0, 600)),
+                }
+                for i in range(start, min(n, start + 50_000)) for _ in range(rng.randint(0, 3))
+            ])
+
+
+def per_car(limit):
+    predictor = fleet.load_predictor(fleet.registry_kwargs())
+    db = SessionLocal()
+    start = time.perf_counter()
+    for last_id, _, cars in fleet.read_chunks(0, 1000, {"skipped": 0, "no_service_history": 0}):
+        for car in cars:
+            result = predictor.predict(car)
+            db.add(models.PredictionHistory(
+                user_id=car.user_id, vehicle_id=car.vehicle_id, make=car.make, model=car.model,
+                year=car.year, mileage=car.mileage, service_needed=result["service_needed"],
+                confidence=result["confidence"],
+                estimated_days_until_service=result["estimated_days_until_service"],
+                recommended_services=json.dumps(result["recommended_services"]),
+                risk_level=result["risk_level"],
+            ))
+            db.commit()
+        if last_id >= limit:
+            break
+    db.close()
+    return last_id / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vehicles", type=int, default=100_000)
+    parser.add_argument("--per-car", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    seed(args.vehicles, random.Random(42))
+    checkpoint = os.path.join(DB_DIR, "checkpoint.json")
+
+    print(f"per-car: {per_car(args.per_car):.0f} vehicles/s")
+    for workers in args.workers:
+        start = time.perf_counter()
+        fleet.run(workers, args.chunk_size, checkpoint, restart=True, log=lambda message: None)
+        elapsed = time.perf_counter() - start
+        print(f"fleet workers={workers}: {args.vehicles / elapsed:.0f} vehicles/s ({elapsed:.1f}s incl. startup)")
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare the joblib RandomForest with its compiled array-backed form.
+
+Checks predict_proba parity on the training data, then reports file size,
+load time, in-memory size of the model arrays and scoring latency.
+
+Run from the backend directory:
+    python -m benchmarks.bench_forest
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.forest import CompiledForest, compile_forest
+from benchmarks.common import ML_DIR, percentile
+
+
+def load_time(loader, path):
+    start = time.perf_counter()
+    obj = loader(path)
+    return obj, time.perf_counter() - start
+
+
+def sklearn_nbytes(model):
+    # Tree node arrays live in Cython buffers that tracemalloc cannot see
+    total = 0
+    for estimator in model.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return total
+
+
+def single_row_latency(model, X, calls):
+    samples = []
+    for i in range(calls):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def batch_rows_per_second(model, X):
+    start = time.perf_counter()
+    model.predict_proba(X)
+    return len(X) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=os.path.join(ML_DIR, "model.pkl"))
+    parser.add_argument("--scaler", default=os.path.join(ML_DIR, "scaler.pkl"))
+    parser.add_argument("--dataset", default=os.path.join(ML_DIR, "dataset_nepal.csv"))
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    compiled_path = os.path.splitext(args.model)[0] + ".npz"
+    if not os.path.exists(compiled_path):
+        compile_forest(joblib.load(args.model)).save(compiled_path)
+
+    sk, sk_load = load_time(joblib.load, args.model)
+    cf, cf_load = load_time(CompiledForest.load, compiled_path)
+    sk_mem = sklearn_nbytes(sk)
+    cf_mem = cf.nbytes
+
+    scaler = joblib.load(args.scaler)
+    df = pd.read_csv(args.dataset)
+    X = scaler.transform(df[["year", "mileage", "engine_size", "days_since_service"]])
+
+    expected = sk.predict_proba(X)
+    actual = cf.predict_proba(X)
+    print("parity")
+    print(f"  max |proba diff|        {np.abs(expected - actual).max():.3e}")
+    print(f"  label agreement         {np.mean(expected.argmax(1) == actual.argmax(1)):.4%}")
+    print(f"  rounded confidence eq.  {np.mean(np.round(expected[:, 1], 2) == np.round(actual[:, 1], 2)):.4%}")
+
+    print(f"\n{'':<26}{'sklearn':>14}{'compiled':>14}")
+    print(f"{'file size (MB)':<26}{os.path.getsize(args.model) / 1e6:>14.1f}{os.path.getsize(compiled_path) / 1e6:>14.1f}")
+    print(f"{'load time (ms)':<26}{sk_load * 1e3:>14.1f}{cf_load * 1e3:>14.1f}")
+    print(f"{'model arrays (MB)':<26}{sk_mem / 1e6:>14.1f}{cf_mem / 1e6:>14.1f}")
+
+    sk_p50, sk_p99 = single_row_latency(sk, X, args.calls)
+    cf_p50, cf_p99 = single_row_latency(cf, X, args.calls)
+    print(f"{'1 row p50 (us)':<26}{sk_p50:>14.0f}{cf_p50:>14.0f}")
+    print(f"{'1 row p99 (us)':<26}{sk_p99:>14.0f}{cf_p99:>14.0f}")
+    for size in (100, len(X)):
+        print(f"{f'{size} rows (rows/s)':<26}"
+              f"{batch_rows_per_second(sk, X[:size]):>14,.0f}"
+              f"{batch_rows_per_second(cf, X[:size]):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
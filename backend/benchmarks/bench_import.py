@@ -0,0 +1,131 @@
+"""Onboarding a fleet: one POST /services/ per row vs streaming /services/import.
+
+Times --per-row rows through the single-row endpoint, then streams
+uploads of each --sizes rows (NDJSON and CSV, generated on the fly in
+64 KiB chunks) through the import endpoint. Reports rows/s and the
+process's max RSS after each upload, which should not grow with size.
+--trace-memory adds the tracemalloc peak per upload (and slows it down).
+
+Run from the backend directory:
+    python -m benchmarks.bench_import --per-row 2000 --sizes 10000 100000 500000
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_import_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import auth, migrate, models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+CHUNK_BYTES = 64 * 1024
+BASE_DATE = datetime(2015, 1, 1)
+
+
+def service(i):
+    return {
+        "service_type": "Oil Change" if i % 3 else "Brake Pads",
+        "service_date": (BASE_DATE + timedelta(days=i % 3000)).isoformat(),
+        "cost": float(40 + i % 200),
+        "mileage_at_service": float(1000 * (i % 150)),
+        "notes": "imported",
+    }
+
+
+def ndjson_lines(n):
+    for i in range(n):
+        yield json.dumps(service(i)) + "\n"
+
+
+def csv_lines(n):
+    yield "service_type,service_date,cost,mileage_at_service,notes\n"
+    for i in range(n):
+        row = service(i)
+        yield f"{row['service_type']},{row['service_date']},{row['cost']},{row['mileage_at_service']},{row['notes']}\n"
+
+
+async def body(lines):
+    buffered, size = [], 0
+    for line in lines:
+        buffered.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffered).encode()
+            buffered, size = [], 0
+    if buffered:
+        yield "".join(buffered).encode()
+
+
+async def per_row(client, headers, n):
+    start = time.perf_counter()
+    for i in range(n):
+        r = await client.post("/services/", json=service(i), headers=headers)
+        r.raise_for_status()
+    return n / (time.perf_counter() - start)
+
+
+async def upload(client, headers, content_type, lines, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    r = await client.post("/services/import", content=body(lines),
+                          headers={**headers, "Content-Type": content_type}, timeout=None)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    r.raise_for_status()
+    report = r.json()
+    assert report["failed"] == 0, report["errors"][:5]
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return report["imported"] / elapsed, max_rss, peak / 2**20 if peak is not None else None
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': 'fleet@example.com'})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        rate = await per_row(client, headers, args.per_row)
+        print(f"POST /services/ x {args.per_row}: {rate:.0f} rows/s")
+        print(f"{'format':<7} {'rows':>8} {'rows/s':>9} {'rss_MiB':>8} {'traced_MiB':>10}")
+        for n in args.sizes:
+            for name, content_type, lines in (("ndjson", "application/x-ndjson", ndjson_lines(n)),
+                                              ("csv", "text/csv", csv_lines(n))):
+                rate, max_rss, peak = await upload(client, headers, content_type, lines, args.trace_memory)
+                traced = f"{peak:.1f}" if peak is not None else "-"
+                print(f"{name:<7} {n:>8} {rate:>9.0f} {max_rss:>8.0f} {traced:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--per-row", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "fleet@example.com", "hashed_password": "x"}])
+    asyncio.run(run(args))
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Query plans and timings for the per-user list routes, before and after migration 0002.
+
+Seeds a SQLite database at the baseline schema (revision 0001) with millions
+of history rows, times the /predictions/history and /services/ queries,
+upgrades to head and times them again.
+
+Run from the backend directory:
+    python -m benchmarks.bench_indexes --users 2000 --predictions 2000000 --services 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_indexes_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from alembic import command  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import migrate, models  # noqa: E402
+from app.database import engine  # noqa: E402
+
+CHUNK = 50_000
+
+
+def seed(n_users, n_predictions, n_services, vehicles_per_user, seed):
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x"} for i in range(n_users)
+        ])
+        conn.execute(insert(models.Vehicle), [
+            {"user_id": u, "make": "Toyota", "model": "Corolla", "year": 2015}
+            for u in range(1, n_users + 1) for _ in range(vehicles_per_user)
+        ])
+
+        def vehicle_of(user_id):
+            return (user_id - 1) * vehicles_per_user + rng.randint(1, vehicles_per_user)
+
+        for offset in range(0, n_predictions, CHUNK):
+            rows = []
+            for _ in range(min(CHUNK, n_predictions - offset)):
+                user_id = rng.randint(1, n_users)
+                rows.append({
+                    "user_id": user_id, "vehicle_id": vehicle_of(user_id), "make": "Toyota",
+                    "model": "Corolla", "year": 2015, "mileage": 60000.0, "service_needed": True,
+                    "confidence": 0.8, "estimated_days_until_service": 10,
+                    "recommended_services": '["Oil Change"]', "risk_level": "High",
+                    "created_at": start + timedelta(minutes=rng.randint(0, 3_000_000)),
+                })
+            conn.execute(insert(models.PredictionHistory), rows)
+
+        for offset in range(0, n_services, CHUNK):
+            rows = []
+            for _ in range(min(CHUNK, n_services - offset)):
+                user_id = rng.randint(1, n_users)
+                rows.append({
+                    "user_id": user_id, "vehicle_id": vehicle_of(user_id), "service_type": "Oil Change",
+                    "service_date": start + timedelta(minutes=rng.randint(0, 3_000_000)), "cost": 50.0,
+                })
+            conn.execute(insert(models.ServiceRecord), rows)
+
+
+def queries(db, user_id, vehicle_id):
+    """The same queries the list routes build (first page of 100)."""
+    history = db.query(models.PredictionHistory).filter(models.PredictionHistory.user_id == user_id)
+    services = db.query(models.ServiceRecord).filter(models.ServiceRecord.user_id == user_id)
+    return {
+        "predictions/history": history.order_by(models.PredictionHistory.created_at.desc()).limit(100),
+        "predictions/history?vehicle_id": history.filter(
+            models.PredictionHistory.vehicle_id == vehicle_id
+        ).order_by(models.PredictionHistory.created_at.desc()).limit(100),
+        "services/": services.order_by(models.ServiceRecord.service_date.desc()).limit(100),
+        "services/?vehicle_id": services.filter(
+            models.ServiceRecord.vehicle_id == vehicle_id
+        ).order_by(models.ServiceRecord.service_date.desc()).limit(100),
+        "vehicles/": db.query(models.Vehicle).filter(models.Vehicle.user_id == user_id),
+    }
+
+
+def measure(label, n_users, vehicles_per_user, repeats):
+    print(f"\n== {label}")
+    rng = random.Random(0)
+    samples = {}
+    with Session(engine) as db:
+        for i in range(repeats):
+            user_id = rng.randint(1, n_users)
+            vehicle_id = (user_id - 1) * vehicles_per_user + 1
+            for name, query in queries(db, user_id, vehicle_id).items():
+                if i == 0:
+                    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+                    plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+                    print(f"{name:<32} " + " | ".join(row[-1] for row in plan))
+                start = time.perf_counter()
+                query.all()
+                samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    return {name: statistics.median(ms) for name, ms in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--vehicles-per-user", type=int, default=3)
+    parser.add_argument("--predictions", type=int, default=2_000_000)
+    parser.add_argument("--services", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = migrate.alembic_config()
+    command.upgrade(config, migrate.BASELINE_REVISION)
+
+    start = time.perf_counter()
+    seed(args.users, args.predictions, args.services, args.vehicles_per_user, args.seed)
+    print(f"Seeded {args.predictions:,} predictions and {args.services:,} services "
+          f"in {time.perf_counter() - start:.1f}s ({DB_DIR})")
+
+    before = measure(f"revision {migrate.BASELINE_REVISION}", args.users, args.vehicles_per_user, args.repeats)
+
+    start = time.perf_counter()
+    command.upgrade(config, "head")
+    print(f"\nMigrated to head in {time.perf_counter() - start:.1f}s")
+
+    after = measure("head", args.users, args.vehicles_per_user, args.repeats)
+
+    print(f"\n{'query':<32} {'before_ms':>10} {'after_ms':>10} {'speedup':>8}")
+    for name in before:
+        print(f"{name:<32} {before[name]:>10.2f} {after[name]:>10.2f} {before[name] / after[name]:>7.0f}x")
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
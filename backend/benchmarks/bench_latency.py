@@ -0,0 +1,71 @@
+"""Per-call p50/p99 latency of ServicePredictor.predict vs the original
+DataFrame + StandardScaler.transform path.
+
+Run from the backend directory:
+    python -m benchmarks.bench_latency
+"""
+import argparse
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.common import load_predictor, percentile, random_cars
+
+
+def legacy_predict(predictor, data):
+    # The pre-fast-path implementation, kept here as the reference
+    df = pd.DataFrame([{
+        "year": data.year,
+        "mileage": data.mileage,
+        "engine_size": data.engine_size,
+        "days_since_service": (datetime.now() - datetime.strptime(data.last_service_date, "%Y-%m-%d")).days
+    }])
+    X = predictor.scaler.transform(df)
+    prob = predictor.model.predict_proba(X)[0][1]
+    days_since = (datetime.now() - datetime.strptime(data.last_service_date, "%Y-%m-%d")).days
+    return predictor._result(prob, data.mileage, days_since)
+
+
+def legacy_preprocess(predictor, data):
+    df = pd.DataFrame([{
+        "year": data.year,
+        "mileage": data.mileage,
+        "engine_size": data.engine_size,
+        "days_since_service": (datetime.now() - datetime.strptime(data.last_service_date, "%Y-%m-%d")).days
+    }])
+    return predictor.scaler.transform(df)
+
+
+def timings(fn, cars):
+    samples = []
+    for car in cars:
+        start = time.perf_counter()
+        fn(car)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<28} p50 {percentile(samples, 50):>10.1f} us   p99 {percentile(samples, 99):>10.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    predictor = load_predictor()
+    cars = random_cars(args.calls)
+
+    mismatches = sum(legacy_predict(predictor, car) != predictor.predict(car) for car in cars)
+    print(f"parity: {mismatches} mismatches over {len(cars)} cars")
+
+    report("preprocess (before)", timings(lambda c: legacy_preprocess(predictor, c), cars))
+    report("preprocess (after)", timings(predictor.preprocess, cars))
+    report("predict (before)", timings(lambda c: legacy_predict(predictor, c), cars))
+    report("predict (after)", timings(predictor.predict, cars))
+
+
+if __name__ == "__main__":
+    main()
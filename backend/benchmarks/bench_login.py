@@ -0,0 +1,102 @@
+"""Login storm: bcrypt on the event loop (old) vs the bounded password pool.
+
+Runs the app in-process over ASGI. --logins concurrent clients log in
+repeatedly (each from its own IP and account) while a probe
+requests GET /catalog/makes; reports login throughput, rejections and the
+probe's latency.
+
+Run from the backend directory:
+    python -m benchmarks.bench_login --logins 8 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_login_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import auth, migrate, models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.common import percentile  # noqa: E402
+
+PASSWORD = "benchpass"
+
+
+class InlineHasher:
+    """The old login path: bcrypt straight on the event loop."""
+
+    async def verify(self, password, hashed_password, keys=()):
+        return auth.verify_password(password, hashed_password)
+
+    def stats(self):
+        return {}
+
+
+async def run(n_logins, duration):
+    stop = time.perf_counter() + duration
+    logins = rejected = 0
+    probe_ms = []
+
+    async def login(i):
+        nonlocal logins, rejected
+        transport = httpx.ASGITransport(app=app, client=(f"10.0.0.{i}", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            while time.perf_counter() < stop:
+                r = await client.post("/auth/token", data={"username": f"user{i}@example.com", "password": PASSWORD})
+                if r.status_code == 200:
+                    logins += 1
+                else:
+                    rejected += 1
+                    await asyncio.sleep(0.05)
+
+    async def probe():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                await client.get("/catalog/makes")
+                probe_ms.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+    await asyncio.gather(probe(), *(login(i) for i in range(n_logins)))
+    return logins / duration, rejected, probe_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    hashed = auth.get_password_hash(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"user{i}@example.com", "hashed_password": hashed} for i in range(args.logins)
+        ])
+
+    pool = auth.password_hasher
+    print(f"{'mode':<14} {'logins/s':>9} {'rejected':>9} {'probe_p50':>10} {'probe_p99':>10} {'probe_max':>10}")
+    for name, hasher in (("on event loop", InlineHasher()), ("password pool", pool)):
+        auth.password_hasher = hasher
+        rate, rejected, probe_ms = asyncio.run(run(args.logins, args.duration))
+        print(f"{name:<14} {rate:>9.1f} {rejected:>9} {percentile(probe_ms, 50):>10.1f} "
+              f"{percentile(probe_ms, 99):>10.1f} {max(probe_ms):>10.1f}")
+    print(pool.stats())
+    pool.shutdown()
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
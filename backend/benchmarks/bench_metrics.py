@@ -0,0 +1,131 @@
+"""Cost of the metrics layer: requests with METRICS_ENABLED=1 vs 0.
+
+The app reads METRICS_ENABLED at import, so each mode runs in its own
+child process. Each child drives GET /, POST /predict and an
+authenticated GET /vehicles/ (one SQL query) in-process over ASGI,
+sequentially, and reports mean and p99 latency per endpoint. The parent
+also times the raw Histogram.observe and a /metrics scrape.
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics --requests 3000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile
+
+CAR = {"make": "Toyota", "model": "Corolla", "year": 2015, "mileage": 60000.0,
+       "last_service_date": "2024-01-01", "engine_size": 1.5, "transmission": "Manual", "fuel_type": "Petrol"}
+
+
+async def drive(n):
+    import httpx
+    from sqlalchemy import insert
+
+    from app import auth, inference, migrate, models
+    from app.database import engine
+    from app.main import app
+
+    migrate.upgrade()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "bench@example.com", "hashed_password": "x"}])
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': 'bench@example.com'})}"}
+    # Every request would otherwise hit the prediction cache after the first
+    inference.registry.active.cache = None
+
+    calls = {
+        "GET /": lambda c: c.get("/"),
+        "POST /predict": lambda c: c.post("/predict", json=CAR),
+        "GET /vehicles/": lambda c: c.get("/vehicles/", headers=headers),
+    }
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, call in calls.items():
+            for _ in range(200):
+                await call(client)
+            samples = []
+            for _ in range(n):
+                start = time.perf_counter()
+                r = await call(client)
+                samples.append((time.perf_counter() - start) * 1e6)
+                r.raise_for_status()
+            results[name] = {"mean_us": sum(samples) / n, "p99_us": percentile(samples, 99)}
+    return results
+
+
+def child(n):
+    db_dir = tempfile.mkdtemp(prefix="bench_metrics_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    from app import inference
+
+    inference.registry.active  # load the model before timing
+    print(json.dumps(asyncio.run(drive(n))))
+
+    from app.database import engine
+
+    engine.dispose()
+    for name in os.listdir(db_dir):
+        os.remove(os.path.join(db_dir, name))
+    os.rmdir(db_dir)
+
+
+def run_mode(enabled, n):
+    env = {**os.environ, "METRICS_ENABLED": "1" if enabled else "0"}
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_metrics", "--child", "--requests", str(n)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def micro():
+    from app import metrics
+
+    histogram = metrics.Histogram("bench_seconds", "bench", ("route",))
+    n = 200_000
+    start = time.perf_counter()
+    for i in range(n):
+        histogram.observe(0.003, "/predict")
+    observe_ns = (time.perf_counter() - start) / n * 1e9
+
+    for route in range(40):
+        for status in ("200", "404", "500"):
+            metrics.http_requests.observe(0.01, "GET", f"/route{route}", status)
+    start = time.perf_counter()
+    for _ in range(100):
+        text = metrics.render()
+    render_ms = (time.perf_counter() - start) / 100 * 1000
+    return observe_ns, render_ms, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests)
+        return
+
+    off = run_mode(False, args.requests)
+    on = run_mode(True, args.requests)
+    print(f"{'endpoint':<16} {'off_mean_us':>12} {'on_mean_us':>11} {'overhead_us':>12} {'off_p99_us':>11} {'on_p99_us':>10}")
+    for name in off:
+        print(f"{name:<16} {off[name]['mean_us']:>12.1f} {on[name]['mean_us']:>11.1f} "
+              f"{on[name]['mean_us'] - off[name]['mean_us']:>12.1f} "
+              f"{off[name]['p99_us']:>11.1f} {on[name]['p99_us']:>10.1f}")
+
+    observe_ns, render_ms, size = micro()
+    print(f"Histogram.observe: {observe_ns:.0f} ns; /metrics render with 120 route series: "
+          f"{render_ms:.2f} ms ({size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Load test: per-request threadpool scoring vs the micro-batching scheduler.
+
+Drives ``--concurrency`` simulated clients against each dispatch mode on
+one event loop and reports throughput and p50/p99 latency.
+
+Run from the backend directory:
+    python -m benchmarks.bench_microbatch --concurrency 64
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.batching import MicroBatcher
+from benchmarks.common import load_predictor, percentile, random_cars
+
+
+async def drive(submit, cars, concurrency, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await submit(cars[i % len(cars)])
+            latencies.append((time.perf_counter() - start) * 1000)
+            i += concurrency
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return len(latencies) / (time.perf_counter() - start), latencies
+
+
+def report(label, throughput, latencies):
+    print(f"{label:<24} {throughput:>10,.0f} req/s   "
+          f"p50 {percentile(latencies, 50):>8.1f} ms   p99 {percentile(latencies, 99):>8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    predictor = load_predictor()
+    cars = random_cars(5000)
+    predictor.predict_many(cars[:10])
+
+    throughput, latencies = await drive(
+        lambda car: run_in_threadpool(predictor.predict, car),
+        cars, args.concurrency, args.duration,
+    )
+    report("threadpool per request", throughput, latencies)
+
+    batcher = MicroBatcher(
+        predictor.predict_many,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    await batcher.start()
+    throughput, latencies = await drive(batcher.submit, cars, args.concurrency, args.duration)
+    await batcher.stop()
+    report("micro-batched", throughput, latencies)
+
+    stats = batcher.stats()
+    print(f"\nmean batch size {stats['mean_batch_size']}, "
+          f"mean queue wait {stats['mean_queue_wait_ms']} ms")
+    print("batch sizes:", {k: v for k, v in stats["batch_size_histogram"].items() if v})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
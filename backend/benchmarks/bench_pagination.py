@@ -0,0 +1,108 @@
+"""Deep-page latency of /predictions/history: OFFSET vs keyset cursor as the table grows.
+
+Grows one user's history in steps and, at each size, times fetching the
+page 90% of the way down with ?skip= and with the equivalent ?cursor=.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pagination --steps 250000 500000 1000000 2000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_pagination_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import migrate, models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.pagination import NEXT_CURSOR_HEADER, encode_cursor, paginate  # noqa: E402
+
+CHUNK = 50_000
+ORDER_BY = [models.PredictionHistory.created_at, models.PredictionHistory.id]
+
+
+class _Response:
+    def __init__(self):
+        self.headers = {}
+
+
+def grow(rng, start_count, target):
+    base = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(start_count, target, CHUNK):
+            conn.execute(insert(models.PredictionHistory), [
+                {
+                    "user_id": 1, "make": "Toyota", "model": "Corolla", "year": 2015, "mileage": 60000.0,
+                    "service_needed": True, "confidence": 0.8, "estimated_days_until_service": 10,
+                    "recommended_services": "[]", "risk_level": "High",
+                    "created_at": base + timedelta(seconds=rng.randint(0, 200_000_000)),
+                }
+                for _ in range(min(CHUNK, target - offset))
+            ])
+
+
+def history(db):
+    return db.query(models.PredictionHistory).filter(models.PredictionHistory.user_id == 1)
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, nargs="+", default=[250_000, 500_000, 1_000_000, 2_000_000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--depth", type=float, default=0.9, help="page position as a fraction of the history")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "fleet@example.com", "hashed_password": "x"}])
+
+    rng = random.Random(args.seed)
+    rows = 0
+    print(f"{'rows':>10} {'skip':>10} {'offset_ms':>10} {'cursor_ms':>10}")
+    for target in args.steps:
+        grow(rng, rows, target)
+        rows = target
+        skip = int(rows * args.depth)
+
+        with Session(engine) as db:
+            offset_ms, offset_rows = timed(
+                lambda: paginate(history(db), _Response(), ORDER_BY, args.limit, skip=skip), args.repeats)
+
+            # The cursor a client would hold after walking to row `skip`
+            last = history(db).order_by(*(c.desc() for c in ORDER_BY)).offset(skip - 1).first()
+            cursor = encode_cursor(getattr(last, c.key) for c in ORDER_BY)
+            response = _Response()
+            cursor_ms, cursor_rows = timed(
+                lambda: paginate(history(db), response, ORDER_BY, args.limit, cursor=cursor), args.repeats)
+
+        assert [r.id for r in offset_rows] == [r.id for r in cursor_rows]
+        assert NEXT_CURSOR_HEADER in response.headers
+        print(f"{rows:>10,} {skip:>10,} {offset_ms:>10.2f} {cursor_ms:>10.2f}", flush=True)
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Predict-then-save (two calls, one commit per row) vs /predictions/predict.
+
+Runs the app in-process over ASGI with --clients concurrent users scoring
+cars for --duration seconds in each mode, then checks that every scored
+car landed in prediction_history. Reports throughput, client latency and
+the write-behind flush stats.
+
+Run from the backend directory:
+    python -m benchmarks.bench_predict_save --clients 8 --duration 10
+
+The two-call flow holds two pooled connections per request in the default
+sync DB mode, so above ~7 clients set DB_ASYNC=1 or raise DB_POOL_SIZE.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_predict_save_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import auth, migrate, models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.write_behind import history_writer  # noqa: E402
+from benchmarks.common import percentile, random_cars  # noqa: E402
+
+
+def history_count():
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(models.PredictionHistory)).scalar_one()
+
+
+async def two_calls(client, car, headers):
+    r = await client.post("/predict", json=car)
+    r.raise_for_status()
+    result = r.json()
+    r = await client.post("/predictions/save", headers=headers, json={
+        **car,
+        **{k: result[k] for k in ("service_needed", "confidence", "estimated_days_until_service", "risk_level")},
+        "recommended_services": json.dumps(result["recommended_services"]),
+    })
+    r.raise_for_status()
+
+
+async def one_call(client, car, headers):
+    r = await client.post("/predictions/predict", json=car, headers=headers)
+    r.raise_for_status()
+
+
+async def run(flow, n_clients, duration, cars):
+    latencies = []
+
+    async def client_loop(i):
+        headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': f'user{i}@example.com'})}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            n = i
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                await flow(client, cars[n % len(cars)], headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                n += n_clients
+
+    async with app.router.lifespan_context(app):
+        stop = time.perf_counter() + duration
+        await asyncio.gather(*(client_loop(i) for i in range(n_clients)))
+    # Leaving the lifespan flushed the write-behind buffer
+    return len(latencies), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x"} for i in range(args.clients)
+        ])
+    cars = [car.model_dump() for car in random_cars(1000)]
+
+    print(f"{'flow':<22} {'req/s':>8} {'p50_ms':>8} {'p99_ms':>8} {'persisted':>10}")
+    for name, flow in (("predict + save", two_calls), ("predictions/predict", one_call)):
+        before = history_count()
+        done, latencies = asyncio.run(run(flow, args.clients, args.duration, cars))
+        persisted = history_count() - before
+        print(f"{name:<22} {done / args.duration:>8.1f} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 99):>8.2f} {persisted:>5}/{done:<5}")
+    print(history_writer.stats())
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Cost of the profiling middleware on GET /vehicles/ and GET /predictions/stats.
+
+Three modes, each in its own process since the app reads
+PROFILING_ENABLED at import:
+  off        PROFILING_ENABLED=0 (middleware not installed)
+  idle       enabled, requests without the header and no sampling
+  profiled   enabled, every request sent with X-Profile: 1 by a superuser
+
+Run from the backend directory:
+    python -m benchmarks.bench_profiling --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile
+
+MODES = {
+    "off": {"PROFILING_ENABLED": "0"},
+    "idle": {"PROFILING_ENABLED": "1"},
+    "profiled": {"PROFILING_ENABLED": "1", "BENCH_PROFILE_HEADER": "1"},
+}
+
+
+async def drive(n):
+    import httpx
+    from sqlalchemy import insert
+
+    from app import auth, migrate, models
+    from app.database import engine
+    from app.main import app
+
+    migrate.upgrade()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "root@example.com", "hashed_password": "x", "is_superuser": True}])
+        conn.execute(insert(models.Vehicle), [
+            {"user_id": 1, "make": "Toyota", "model": "Yaris", "year": 2010 + i % 10} for i in range(20)
+        ])
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': 'root@example.com'})}"}
+    if os.getenv("BENCH_PROFILE_HEADER") == "1":
+        headers["X-Profile"] = "1"
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/vehicles/", "/predictions/stats"):
+            for _ in range(100):
+                await client.get(path, headers=headers)
+            samples = []
+            for _ in range(n):
+                start = time.perf_counter()
+                r = await client.get(path, headers=headers)
+                samples.append((time.perf_counter() - start) * 1000)
+                r.raise_for_status()
+            results[path] = {"mean_ms": sum(samples) / n, "p99_ms": percentile(samples, 99)}
+    return results
+
+
+def child(n):
+    db_dir = tempfile.mkdtemp(prefix="bench_profiling_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    print(json.dumps(asyncio.run(drive(n))))
+
+    from app.database import engine
+
+    engine.dispose()
+    for name in os.listdir(db_dir):
+        os.remove(os.path.join(db_dir, name))
+    os.rmdir(db_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests)
+        return
+
+    results = {}
+    for mode, env in MODES.items():
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_profiling", "--child", "--requests", str(args.requests)],
+            env={**os.environ, **env}, check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'endpoint':<20} {'mode':<9} {'mean_ms':>8} {'p99_ms':>8}")
+    for path in results["off"]:
+        for mode in MODES:
+            print(f"{path:<20} {mode:<9} {results[mode][path]['mean_ms']:>8.3f} {results[mode][path]['p99_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
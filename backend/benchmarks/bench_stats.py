@@ -0,0 +1,114 @@
+"""/predictions/stats cost: the old five COUNTs vs one aggregate vs the counters table.
+
+Seeds one user with --predictions rows through a Core bulk insert (the
+counters are filled by StatsDelta, as bulk paths must), then times each way
+of reading the dashboard numbers.
+
+Run from the backend directory:
+    python -m benchmarks.bench_stats --predictions 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_stats_")
+# app.database reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+from sqlalchemy import extract, func, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import migrate, models, stats  # noqa: E402
+from app.database import engine  # noqa: E402
+
+CHUNK = 50_000
+
+
+def seed(n_predictions, seed):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "fleet@example.com", "hashed_password": "x"}])
+        for offset in range(0, n_predictions, CHUNK):
+            delta = stats.StatsDelta()
+            rows = []
+            for _ in range(min(CHUNK, n_predictions - offset)):
+                row = {
+                    "user_id": 1, "make": "Toyota", "model": "Corolla", "year": 2015, "mileage": 60000.0,
+                    "service_needed": rng.random() < 0.5, "confidence": 0.8,
+                    "estimated_days_until_service": rng.randint(0, 90), "recommended_services": "[]",
+                    "risk_level": "High", "created_at": now - timedelta(minutes=rng.randint(0, 2_000_000)),
+                }
+                rows.append(row)
+                delta.add_prediction(1, row["created_at"], row["service_needed"], row["estimated_days_until_service"])
+            conn.execute(insert(models.PredictionHistory), rows)
+            delta.apply(conn)
+
+
+def five_counts(db, user_id):
+    """What the endpoint used to run."""
+    PredictionHistory = models.PredictionHistory
+    now = datetime.now()
+    return {
+        "total_predictions": db.query(func.count(PredictionHistory.id)).filter(
+            PredictionHistory.user_id == user_id).scalar(),
+        "total_vehicles": db.query(func.count(models.Vehicle.id)).filter(
+            models.Vehicle.user_id == user_id).scalar(),
+        "total_services": db.query(func.count(models.ServiceRecord.id)).filter(
+            models.ServiceRecord.user_id == user_id).scalar(),
+        "predictions_this_month": db.query(func.count(PredictionHistory.id)).filter(
+            PredictionHistory.user_id == user_id,
+            extract("month", PredictionHistory.created_at) == now.month,
+            extract("year", PredictionHistory.created_at) == now.year).scalar(),
+        "upcoming_services": db.query(func.count(PredictionHistory.id)).filter(
+            PredictionHistory.user_id == user_id, *stats.upcoming_criteria()).scalar(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--predictions", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    migrate.upgrade()
+    start = time.perf_counter()
+    seed(args.predictions, args.seed)
+    print(f"Seeded {args.predictions:,} predictions for one user in {time.perf_counter() - start:.1f}s")
+
+    ways = {
+        "five COUNT queries (old)": five_counts,
+        "single aggregate (fallback)": stats.aggregate_user_stats,
+        "counters table": stats.get_user_stats,
+    }
+    results = {}
+    with Session(engine) as db:
+        for name, fn in ways.items():
+            samples = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                results[name] = fn(db, 1)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"{name:<30} {statistics.median(samples):>9.2f} ms")
+
+    # The old query bucketed by local time; the others use UTC months
+    assert results["single aggregate (fallback)"] == results["counters table"], results
+
+    with engine.begin() as conn:
+        start = time.perf_counter()
+        stats.rebuild(conn)
+        print(f"\nrebuild: {time.perf_counter() - start:.1f}s")
+
+    engine.dispose()
+    for name in os.listdir(DB_DIR):
+        os.remove(os.path.join(DB_DIR, name))
+    os.rmdir(DB_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+import random
+from datetime import date, timedelta
+
+from app.schemas import CarData
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_DIR = os.path.join(BACKEND_DIR, "app", "ml")
+
+MAKES_MODELS = {
+    "Suzuki": ["Alto", "Wagon R", "Baleno", "Swift"],
+    "Hyundai": ["i10", "i20", "Creta", "Venue"],
+    "Toyota": ["Yaris", "Corolla", "Hilux"],
+}
+
+
+def load_predictor():
+    from app.predictor import ServicePredictor
+    return ServicePredictor(
+        model_path=os.path.join(ML_DIR, "model.pkl"),
+        scaler_path=os.path.join(ML_DIR, "scaler.pkl"),
+    )
+
+
+def random_cars(n, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    cars = []
+    for _ in range(n):
+        make = rng.choice(list(MAKES_MODELS))
+        cars.append(CarData(
+            make=make,
+            model=rng.choice(MAKES_MODELS[make]),
+            year=rng.randint(1998, 2023),
+            mileage=float(rng.randint(3000, 200000)),
+            last_service_date=(today - timedelta(days=rng.randint(0, 600))).isoformat(),
+            engine_size=round(rng.uniform(0.8, 2.4), 1),
+            transmission=rng.choice(["Manual", "Automatic"]),
+            fuel_type=rng.choice(["Petrol", "Diesel"]),
+        ))
+    return cars
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
@@ -0,0 +1,318 @@
+"""HTTP load against a seeded database, with a baseline to catch regressions.
+
+Seeds (or reuses) a database with benchmarks.seed, then drives each
+workload for --duration seconds after --warmup seconds, with --concurrency
+closed-loop clients:
+  predict   POST /predict with a random car
+  login     POST /auth/token (bcrypt verify)
+  history   GET /predictions/history for a random user
+  catalog   GET /catalog/makes
+  mixed     all of the above, weighted by MIXED
+against the app in-process over ASGI (lifespan included) and/or a uvicorn
+server on a free local port. Each client draws from its own seeded
+random.Random, so a rerun sends the same request mix. Reports throughput,
+error rate and p50/p95/p99 latency per mode and workload (and per
+endpoint within mixed).
+
+--save-baseline writes the results as JSON; --baseline compares against
+such a file and exits 1 when throughput drops or latency or the error
+rate rises past the thresholds. Numbers only compare on the same machine
+with the same settings. With one CPU the clients and the server share it,
+and sync-DB routes can exhaust the connection pool above about 7 clients
+unless DB_ASYNC=1.
+
+All clients log in from one address, so PASSWORD_PER_CLIENT_LIMIT is
+raised to --concurrency unless it is already set.
+
+Run from the backend directory:
+    python -m benchmarks.harness --mode inprocess uvicorn --save-baseline baseline.json
+    python -m benchmarks.harness --mode inprocess uvicorn --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+
+from benchmarks import seed
+from benchmarks.common import BACKEND_DIR, MAKES_MODELS, percentile
+
+WORKLOADS = ("predict", "login", "history", "catalog", "mixed")
+MIXED = {"predict": 50, "history": 25, "catalog": 20, "login": 5}
+LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def car_payload(rng):
+    make = rng.choice(list(MAKES_MODELS))
+    return {
+        "make": make,
+        "model": rng.choice(MAKES_MODELS[make]),
+        "year": rng.randint(1998, 2023),
+        "mileage": float(rng.randint(3000, 200000)),
+        "last_service_date": (date.today() - timedelta(days=rng.randint(0, 600))).isoformat(),
+        "engine_size": round(rng.uniform(0.8, 2.4), 1),
+        "transmission": rng.choice(["Manual", "Automatic"]),
+        "fuel_type": rng.choice(["Petrol", "Diesel"]),
+    }
+
+
+class Endpoints:
+    def __init__(self, users):
+        self.users = users
+        self._tokens = {}
+
+    def token(self, user):
+        from app import auth
+
+        if user not in self._tokens:
+            self._tokens[user] = auth.create_access_token({"sub": seed.email(user)}, timedelta(days=1))
+        return self._tokens[user]
+
+    def predict(self, client, rng, worker):
+        return client.post("/predict", json=car_payload(rng))
+
+    def login(self, client, rng, worker):
+        # One account per client, so the per-account limit never rejects
+        return client.post("/auth/token", data={"username": seed.email(worker % self.users), "password": seed.PASSWORD})
+
+    def history(self, client, rng, worker):
+        token = self.token(rng.randrange(self.users))
+        return client.get("/predictions/history", params={"limit": 20}, headers={"Authorization": f"Bearer {token}"})
+
+    def catalog(self, client, rng, worker):
+        return client.get("/catalog/makes")
+
+
+def summarize(latencies, statuses, elapsed):
+    errors = sum(n for status, n in statuses.items() if not (isinstance(status, int) and status < 400))
+    requests = sum(statuses.values())
+    ms = [s * 1000 for s in latencies]
+    return {
+        "requests": requests,
+        "rps": requests / elapsed if elapsed > 0 else 0.0,
+        "error_rate": errors / requests if requests else 0.0,
+        "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        "mean_ms": sum(ms) / len(ms) if ms else 0.0,
+        **{name: percentile(ms, int(name[1:3])) for name in LATENCIES},
+    }
+
+
+async def drive(client, endpoints, workload, concurrency, warmup, duration, seed_value):
+    """Closed loop: each client sends its next request as soon as the last returns."""
+    import httpx
+
+    names = list(MIXED) if workload == "mixed" else [workload]
+    weights = [MIXED[name] for name in names] if workload == "mixed" else None
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    measure_from = time.perf_counter() + warmup
+    stop = measure_from + duration
+
+    async def worker(i):
+        rng = random.Random(f"{seed_value}:{workload}:{i}")
+        while time.perf_counter() < stop:
+            name = rng.choices(names, weights)[0] if weights else names[0]
+            started = time.perf_counter()
+            try:
+                status = (await getattr(endpoints, name)(client, rng, i)).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if started >= measure_from:
+                latencies[name].append(time.perf_counter() - started)
+                statuses[name][status] += 1
+            if status == 429 or status == 503:
+                # Honour the backpressure instead of spinning on rejections
+                await asyncio.sleep(0.05)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+    result = summarize(
+        [s for name in names for s in latencies[name]],
+        sum(statuses.values(), Counter()), elapsed,
+    )
+    if workload == "mixed":
+        result["endpoints"] = {name: summarize(latencies[name], statuses[name], elapsed) for name in names}
+    return result
+
+
+@asynccontextmanager
+async def inprocess_client():
+    import httpx
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(concurrency, workers=1):
+    import httpx
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env={**os.environ, "DB_AUTO_MIGRATE": "0"},
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.perf_counter() + 60
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {server.returncode}")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() > deadline:
+                    raise SystemExit("uvicorn did not become healthy within 60s")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def run(args, users):
+    endpoints = Endpoints(users)
+    results = {}
+    for mode in args.mode:
+        if mode == "inprocess":
+            context = inprocess_client()
+        else:
+            context = uvicorn_client(args.concurrency, args.uvicorn_workers)
+        async with context as client:
+            for workload in args.workload:
+                result = await drive(client, endpoints, workload, args.concurrency,
+                                     args.warmup, args.duration, args.seed)
+                results[f"{mode}/{workload}"] = result
+                print_row(f"{mode}/{workload}", result)
+                for name, sub in result.get("endpoints", {}).items():
+                    print_row(f"  {name}", sub)
+    return results
+
+
+def print_header():
+    print(f"{'workload':<20} {'requests':>8} {'rps':>8} {'errors':>7} {'mean_ms':>8} "
+          f"{'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}")
+
+
+def print_row(name, r):
+    print(f"{name:<20} {r['requests']:>8} {r['rps']:>8.1f} {r['error_rate']:>6.1%} {r['mean_ms']:>8.2f} "
+          f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}", flush=True)
+
+
+def compare(current, baseline, max_rps_drop, max_latency_increase, max_error_increase):
+    """Return (workload, metric, baseline, current, regressed) rows for workloads in both runs.
+
+    Throughput and latency thresholds are fractions of the baseline value;
+    the error-rate threshold is an absolute increase.
+    """
+    rows = []
+    for key, base in baseline.items():
+        cur = current.get(key)
+        if cur is None:
+            continue
+        rows.append((key, "rps", base["rps"], cur["rps"], cur["rps"] < base["rps"] * (1 - max_rps_drop)))
+        for metric in LATENCIES:
+            limit = base[metric] * (1 + max_latency_increase)
+            rows.append((key, metric, base[metric], cur[metric], cur[metric] > limit))
+        rows.append((key, "error_rate", base["error_rate"], cur["error_rate"],
+                     cur["error_rate"] > base["error_rate"] + max_error_increase))
+    return rows
+
+
+def print_comparison(rows):
+    print(f"\n{'workload':<20} {'metric':<10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, metric, base, cur, regressed in rows:
+        change = f"{(cur - base) / base:+.1%}" if base else "n/a"
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<20} {metric:<10} {base:>10.3f} {cur:>10.3f} {change:>8}{flag}")
+
+
+def settings(args, seeded):
+    return {
+        "seeded": seeded, "concurrency": args.concurrency, "duration": args.duration,
+        "warmup": args.warmup, "uvicorn_workers": args.uvicorn_workers,
+        "db_async": os.getenv("DB_ASYNC", "0"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", nargs="+", choices=("inprocess", "uvicorn"), default=["inprocess"])
+    parser.add_argument("--workload", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per workload")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each workload")
+    parser.add_argument("--uvicorn-workers", type=int, default=1)
+    parser.add_argument("--db", help="database file to seed or reuse (default: a temporary one)")
+    seed.add_arguments(parser)
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--save-baseline", help="write the results JSON here as the new baseline")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--max-rps-drop", type=float, default=0.10)
+    parser.add_argument("--max-latency-increase", type=float, default=0.20)
+    parser.add_argument("--max-error-increase", type=float, default=0.01)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PASSWORD_PER_CLIENT_LIMIT", str(max(2, args.concurrency)))
+    db_dir = None if args.db else tempfile.mkdtemp(prefix="bench_harness_")
+    db_path = args.db or os.path.join(db_dir, "bench.db")
+    try:
+        seeded = seed.ensure_seeded(db_path, args.users, args.vehicles, args.predictions,
+                                    args.services, args.seed)
+        print_header()
+        results = asyncio.run(run(args, args.users))
+    finally:
+        if db_dir:
+            shutil.rmtree(db_dir, ignore_errors=True)
+
+    report = {
+        "settings": settings(args, seeded),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["settings"] != report["settings"]:
+            print(f"warning: baseline settings differ: {baseline['settings']}")
+        rows = compare(results, baseline["results"], args.max_rps_drop,
+                       args.max_latency_increase, args.max_error_increase)
+        print_comparison(rows)
+        if any(row[-1] for row in rows):
+            print("Regression against baseline")
+            sys.exit(1)
+        print("No regression against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Deterministic benchmark database: users, catalog, vehicles, history.
+
+The same sizes and --seed always produce the same rows. Every user is
+user<N>@example.com with password PASSWORD; they share one bcrypt hash,
+which costs as much to verify as a per-user hash would. The sizes are
+recorded in <db>.seed.json, and a database whose sidecar matches is
+reused instead of being seeded again.
+
+Run from the backend directory:
+    python -m benchmarks.seed --db /tmp/bench.db --users 200 --vehicles 2000 --predictions 50000 --services 20000
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import MAKES_MODELS
+
+PASSWORD = "benchpass"
+CHUNK = 50_000
+SERVICE_TYPES = ["Oil Change", "Brake Inspection", "Tire Rotation", "Air Filter", "Full Service"]
+RISK_LEVELS = ["low", "medium", "high"]
+# Fixed so reruns on different days produce identical rows
+EPOCH = datetime(2024, 1, 1)
+
+
+def email(i):
+    return f"user{i}@example.com"
+
+
+def sidecar(db_path):
+    return f"{db_path}.seed.json"
+
+
+def is_seeded(db_path, params):
+    if not os.path.exists(db_path) or not os.path.exists(sidecar(db_path)):
+        return False
+    with open(sidecar(db_path)) as f:
+        return json.load(f) == params
+
+
+def _chunks(n, make_row):
+    for start in range(0, n, CHUNK):
+        yield [make_row(i) for i in range(start, min(n, start + CHUNK))]
+
+
+def seed(engine, users, vehicles, predictions, services, seed=42):
+    """Insert the rows with executemany and rebuild the stats counters."""
+    from sqlalchemy import insert
+
+    from app import auth, models, stats
+
+    rng = random.Random(seed)
+    hashed = auth.get_password_hash(PASSWORD)
+    makes = list(MAKES_MODELS)
+    # Vehicles go round-robin to users; vehicle i belongs to user 1 + i % users
+    fleet = []
+    for _ in range(vehicles):
+        make = rng.choice(makes)
+        fleet.append((make, rng.choice(MAKES_MODELS[make]), rng.randint(1998, 2023)))
+
+    def vehicle_row(i):
+        make, model, year = fleet[i]
+        return {
+            "user_id": 1 + i % users, "make": make, "model": model, "year": year,
+            "mileage": float(rng.randint(3000, 200000)), "engine_size": round(rng.uniform(0.8, 2.4), 1),
+            "transmission": rng.choice(["Manual", "Automatic"]), "fuel_type": rng.choice(["Petrol", "Diesel"]),
+            "created_at": EPOCH - timedelta(days=rng.randint(400, 1500)),
+        }
+
+    def prediction_row(i):
+        v = rng.randrange(vehicles)
+        make, model, year = fleet[v]
+        needed = rng.random() < 0.4
+        return {
+            "user_id": 1 + v % users, "vehicle_id": 1 + v, "make": make, "model": model, "year": year,
+            "mileage": float(rng.randint(3000, 200000)), "service_needed": needed,
+            "confidence": round(rng.uniform(0.5, 1.0), 3),
+            "estimated_days_until_service": rng.randint(0, 30) if needed else rng.randint(31, 365),
+            "recommended_services": json.dumps(rng.sample(SERVICE_TYPES, 2)),
+            "risk_level": rng.choice(RISK_LEVELS),
+            "created_at": EPOCH - timedelta(seconds=rng.randint(0, 365 * 86400)),
+        }
+
+    def service_row(i):
+        v = rng.randrange(vehicles)
+        return {
+            "user_id": 1 + v % users, "vehicle_id": 1 + v, "service_type": rng.choice(SERVICE_TYPES),
+            "service_date": EPOCH - timedelta(days=rng.randint(0, 1000)),
+            "cost": round(rng.uniform(20, 900), 2), "mileage_at_service": float(rng.randint(3000, 200000)),
+        }
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.VehicleMake), [{"name": make} for make in makes])
+        conn.execute(insert(models.VehicleModel), [
+            {"make_id": make_id, "name": name}
+            for make_id, make in enumerate(makes, start=1) for name in MAKES_MODELS[make]
+        ])
+        conn.execute(insert(models.User), [
+            {"email": email(i), "hashed_password": hashed, "is_active": True, "is_superuser": False}
+            for i in range(users)
+        ])
+        if vehicles:
+            for rows in _chunks(vehicles, vehicle_row):
+                conn.execute(insert(models.Vehicle), rows)
+            for rows in _chunks(predictions, prediction_row):
+                conn.execute(insert(models.PredictionHistory), rows)
+            for rows in _chunks(services, service_row):
+                conn.execute(insert(models.ServiceRecord), rows)
+        # Core inserts skip the ORM hooks that keep the counters current
+        stats.rebuild(conn)
+
+
+def ensure_seeded(db_path, users, vehicles, predictions, services, seed_value=42, log=print):
+    """Seed ``db_path`` unless it already holds exactly these sizes. Sets DATABASE_URL."""
+    params = {"users": users, "vehicles": vehicles, "predictions": predictions,
+              "services": services, "seed": seed_value}
+    # app.database reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    if is_seeded(db_path, params):
+        log(f"Reusing seeded database {db_path}")
+        return params
+
+    for suffix in ("", "-wal", "-shm", ".seed.json"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    from app import migrate
+    from app.database import engine
+
+    log(f"Seeding {db_path}: {users} users, {vehicles} vehicles, {predictions} predictions, "
+        f"{services} service records")
+    migrate.upgrade()
+    seed(engine, users, vehicles, predictions, services, seed_value)
+    engine.dispose()
+    with open(sidecar(db_path), "w") as f:
+        json.dump(params, f)
+    return params
+
+
+def add_arguments(parser):
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--predictions", type=int, default=50_000)
+    parser.add_argument("--services", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True)
+    add_arguments(parser)
+    args = parser.parse_args()
+    ensure_seeded(args.db, args.users, args.vehicles, args.predictions, args.services, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
-from app import models, auth
+from app.database import SessionLocal
+from app import models, auth, migrate
 import sys
 
-# Ensure tables exist
-models.Base.metadata.create_all(bind=engine)
+# Ensure the schema is current
+migrate.upgrade()
 
 def create_superuser(email, password):
     db: Session = SessionLocal()
@@ -1,8 +1,9 @@
-import pandas as pd
-import numpy as np
-import random
+import argparse
+import os
+import time
 
-np.random.seed(42)
+import numpy as np
+import pandas as pd
 
 makes_models = {
     "Suzuki": ["Alto", "Wagon R", "Baleno", "Swift"],
@@ -18,61 +19,122 @@ driving_styles = ["rough", "normal", "smooth"]
 fuel_types = ["Petrol", "Diesel"]
 transmissions = ["Manual", "Automatic"]
 
-def generate_row():
-    make = random.choice(list(makes_models.keys()))
-    model = random.choice(makes_models[make])
+COLUMNS = [
+    "make", "model", "year", "mileage", "engine_size", "transmission", "fuel_type",
+    "terrain_type", "avg_road_quality", "days_since_service", "driving_style", "service_needed"
+]
+
+DEFAULT_OUTPUT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "ml", "dataset_nepal.csv"
+)
+
+# Flattened make -> model lookup so models can be drawn per row without a loop
+MAKES = np.array(list(makes_models.keys()))
+MODEL_COUNTS = np.array([len(models) for models in makes_models.values()])
+MODEL_OFFSETS = np.concatenate([[0], np.cumsum(MODEL_COUNTS)[:-1]])
+ALL_MODELS = np.array([model for models in makes_models.values() for model in models])
+
 
-    year = np.random.randint(1998, 2024)
-    mileage = np.random.randint(3000, 200000)
-    engine_size = round(np.random.uniform(0.8, 2.4), 1)
-    transmission = random.choice(transmissions)
-    fuel_type = random.choice(fuel_types)
-    terrain = random.choice(terrain_options)
-    road_quality = np.random.randint(1, 6)  # 1–5
-    days_since_service = np.random.randint(0, 600)
-    driving_style = random.choice(driving_styles)
+def generate_chunk(rng, n):
+    make_idx = rng.integers(0, len(MAKES), n)
+    model_idx = MODEL_OFFSETS[make_idx] + (rng.random(n) * MODEL_COUNTS[make_idx]).astype(np.int64)
 
-    # Nepal-based service need probability
-    risk = 0
+    year = rng.integers(1998, 2024, n)
+    mileage = rng.integers(3000, 200000, n)
+    engine_size = np.round(rng.uniform(0.8, 2.4, n), 1)
+    transmission = np.array(transmissions)[rng.integers(0, len(transmissions), n)]
+    fuel_type = np.array(fuel_types)[rng.integers(0, len(fuel_types), n)]
+    terrain = np.array(terrain_options)[rng.integers(0, len(terrain_options), n)]
+    road_quality = rng.integers(1, 6, n)  # 1–5
+    days_since_service = rng.integers(0, 600, n)
+    driving_style = np.array(driving_styles)[rng.integers(0, len(driving_styles), n)]
+
+    # Nepal-based service need probability, same rules and order as before
+    risk = np.zeros(n)
 
     # 🔥 Mileage based rule
-    if mileage % 10000 < 1500:
-        risk += 0.25
+    risk += np.where(mileage % 10000 < 1500, 0.25, 0.0)
 
     # 🔥 Service overdue
-    if days_since_service > 180:
-        risk += 0.35
+    risk += np.where(days_since_service > 180, 0.35, 0.0)
 
     # 🔥 Terrain effect
-    if terrain == "Hills":
-        risk += 0.2
+    risk += np.where(terrain == "Hills", 0.2, 0.0)
 
     # 🔥 Road quality effect
-    if road_quality <= 2:
-        risk += 0.15
+    risk += np.where(road_quality <= 2, 0.15, 0.0)
 
     # 🔥 Driving style
-    if driving_style == "rough":
-        risk += 0.2
+    risk += np.where(driving_style == "rough", 0.2, 0.0)
 
     # 🔥 Diesel cars older than 10 years
-    if fuel_type == "Diesel" and (2024 - year) > 10:
-        risk += 0.25
-
-    service_needed = 1 if risk > 0.45 else 0
-
-    return [
-        make, model, year, mileage, engine_size, transmission, fuel_type,
-        terrain, road_quality, days_since_service, driving_style, service_needed
-    ]
-
-rows = [generate_row() for _ in range(10000)]
-
-df = pd.DataFrame(rows, columns=[
-    "make", "model", "year", "mileage", "engine_size", "transmission", "fuel_type",
-    "terrain_type", "avg_road_quality", "days_since_service", "driving_style", "service_needed"
-])
-
-df.to_csv("ml/dataset_nepal.csv", index=False)
-
-print("Generated dataset_nepal.csv")
+    risk += np.where((fuel_type == "Diesel") & ((2024 - year) > 10), 0.25, 0.0)
+
+    service_needed = (risk > 0.45).astype(np.int64)
+
+    return pd.DataFrame({
+        "make": MAKES[make_idx],
+        "model": ALL_MODELS[model_idx],
+        "year": year,
+        "mileage": mileage,
+        "engine_size": engine_size,
+        "transmission": transmission,
+        "fuel_type": fuel_type,
+        "terrain_type": terrain,
+        "avg_road_quality": road_quality,
+        "days_since_service": days_since_service,
+        "driving_style": driving_style,
+        "service_needed": service_needed,
+    }, columns=COLUMNS)
+
+
+def parquet_writer(path, df):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("--parquet needs pyarrow: pip install pyarrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return pq.ParquetWriter(path, table.schema), pa
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic Nepal service dataset")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="CSV path ('' to skip CSV)")
+    parser.add_argument("--parquet", default=None, help="also stream to this Parquet file")
+    parser.add_argument("--chunk-size", type=int, default=500_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    writer, pa = None, None
+    written = 0
+    start = time.perf_counter()
+
+    try:
+        while written < args.rows:
+            n = min(args.chunk_size, args.rows - written)
+            df = generate_chunk(rng, n)
+
+            if args.output:
+                df.to_csv(args.output, mode="w" if written == 0 else "a", header=written == 0, index=False)
+            if args.parquet:
+                if writer is None:
+                    writer, pa = parquet_writer(args.parquet, df)
+                writer.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+            written += n
+            elapsed = time.perf_counter() - start
+            print(f"{written:,}/{args.rows:,} rows  {written / elapsed:,.0f} rows/s", flush=True)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    targets = ", ".join(p for p in (args.output, args.parquet) if p)
+    print(f"Generated {written:,} rows in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s) -> {targets}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app import models  # noqa: F401  (registers tables on Base.metadata)
+from app.database import Base, engine
+
+config = context.config
+
+# app.migrate runs us in-process with logging already set up
+if config.config_file_name is not None and not config.attributes.get("skip_logging"):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        # SQLite can't ALTER most things in place; batch mode copies the table
+        render_as_batch=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline():
+    configure(url=str(engine.url), literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
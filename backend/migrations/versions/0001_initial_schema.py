@@ -0,0 +1,152 @@
+"""initial schema
+
+The tables exactly as Base.metadata.create_all built them before migrations
+existed; app.migrate stamps such databases at this revision.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 10:53:16.635537
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_superuser', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    op.create_table('vehicle_makes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('vehicle_makes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicle_makes_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_vehicle_makes_name'), ['name'], unique=True)
+
+    op.create_table('vehicle_models',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('make_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['make_id'], ['vehicle_makes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('vehicle_models', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicle_models_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_vehicle_models_name'), ['name'], unique=False)
+
+    op.create_table('vehicles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('make', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('vin', sa.String(), nullable=True),
+    sa.Column('nickname', sa.String(), nullable=True),
+    sa.Column('mileage', sa.Float(), nullable=True),
+    sa.Column('engine_size', sa.Float(), nullable=True),
+    sa.Column('transmission', sa.String(), nullable=True),
+    sa.Column('fuel_type', sa.String(), nullable=True),
+    sa.Column('is_default', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('vin')
+    )
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicles_id'), ['id'], unique=False)
+
+    op.create_table('prediction_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('make', sa.String(), nullable=True),
+    sa.Column('model', sa.String(), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=True),
+    sa.Column('mileage', sa.Float(), nullable=True),
+    sa.Column('last_service_date', sa.String(), nullable=True),
+    sa.Column('engine_size', sa.Float(), nullable=True),
+    sa.Column('transmission', sa.String(), nullable=True),
+    sa.Column('fuel_type', sa.String(), nullable=True),
+    sa.Column('service_needed', sa.Boolean(), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('estimated_days_until_service', sa.Integer(), nullable=True),
+    sa.Column('recommended_services', sa.Text(), nullable=True),
+    sa.Column('risk_level', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('prediction_history', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_prediction_history_id'), ['id'], unique=False)
+
+    op.create_table('service_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('service_type', sa.String(), nullable=False),
+    sa.Column('service_date', sa.DateTime(), nullable=False),
+    sa.Column('cost', sa.Float(), nullable=True),
+    sa.Column('mileage_at_service', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('service_records', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_service_records_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('service_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_service_records_id'))
+
+    op.drop_table('service_records')
+    with op.batch_alter_table('prediction_history', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_prediction_history_id'))
+
+    op.drop_table('prediction_history')
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicles_id'))
+
+    op.drop_table('vehicles')
+    with op.batch_alter_table('vehicle_models', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicle_models_name'))
+        batch_op.drop_index(batch_op.f('ix_vehicle_models_id'))
+
+    op.drop_table('vehicle_models')
+    with op.batch_alter_table('vehicle_makes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicle_makes_name'))
+        batch_op.drop_index(batch_op.f('ix_vehicle_makes_id'))
+
+    op.drop_table('vehicle_makes')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""per-user history indexes
+
+Composite indexes for the list routes (filter by user, optionally vehicle,
+newest first) plus plain indexes on the remaining foreign keys.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:53:28.663610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('prediction_history', schema=None) as batch_op:
+        batch_op.create_index('ix_prediction_history_user_created', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_prediction_history_user_vehicle_created', ['user_id', 'vehicle_id', 'created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_prediction_history_vehicle_id'), ['vehicle_id'], unique=False)
+
+    with op.batch_alter_table('service_records', schema=None) as batch_op:
+        batch_op.create_index('ix_service_records_user_date', ['user_id', 'service_date'], unique=False)
+        batch_op.create_index('ix_service_records_user_vehicle_date', ['user_id', 'vehicle_id', 'service_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_service_records_vehicle_id'), ['vehicle_id'], unique=False)
+
+    with op.batch_alter_table('vehicle_models', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicle_models_make_id'), ['make_id'], unique=False)
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicles_user_id'), ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicles_user_id'))
+
+    with op.batch_alter_table('vehicle_models', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicle_models_make_id'))
+
+    with op.batch_alter_table('service_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_service_records_vehicle_id'))
+        batch_op.drop_index('ix_service_records_user_vehicle_date')
+        batch_op.drop_index('ix_service_records_user_date')
+
+    with op.batch_alter_table('prediction_history', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_prediction_history_vehicle_id'))
+        batch_op.drop_index('ix_prediction_history_user_vehicle_created')
+        batch_op.drop_index('ix_prediction_history_user_created')
+
@@ -0,0 +1,111 @@
+"""user stats counters
+
+Counters behind /predictions/stats (see app/stats.py), backfilled from the
+existing history.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:57:07.238519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_monthly_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('predictions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_predictions', sa.Integer(), nullable=False),
+    sa.Column('total_vehicles', sa.Integer(), nullable=False),
+    sa.Column('total_services', sa.Integer(), nullable=False),
+    sa.Column('upcoming_services', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    backfill(op.get_bind())
+
+
+# Snapshots of the tables as of this revision, so replaying it doesn't depend
+# on the current models
+prediction_history = sa.table(
+    "prediction_history",
+    sa.column("user_id", sa.Integer),
+    sa.column("service_needed", sa.Boolean),
+    sa.column("estimated_days_until_service", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+vehicles = sa.table("vehicles", sa.column("user_id", sa.Integer))
+service_records = sa.table("service_records", sa.column("user_id", sa.Integer))
+users = sa.table("users", sa.column("id", sa.Integer))
+
+
+def count_per_user(table, *criteria):
+    return (
+        sa.select(sa.func.count())
+        .select_from(table)
+        .where(table.c.user_id == users.c.id, *criteria)
+        .scalar_subquery()
+    )
+
+
+def month_of(column, dialect):
+    if dialect == "postgresql":
+        return sa.func.to_char(column, "YYYY-MM")
+    if dialect == "mysql":
+        return sa.func.date_format(column, "%Y-%m")
+    return sa.func.strftime("%Y-%m", column)
+
+
+def backfill(connection):
+    user_stats = sa.table(
+        "user_stats", *(sa.column(name, sa.Integer) for name in (
+            "user_id", "total_predictions", "total_vehicles", "total_services", "upcoming_services"))
+    )
+    totals = sa.select(
+        users.c.id,
+        count_per_user(prediction_history),
+        count_per_user(vehicles),
+        count_per_user(service_records),
+        count_per_user(
+            prediction_history,
+            prediction_history.c.service_needed == sa.true(),
+            prediction_history.c.estimated_days_until_service.between(0, 30),
+        ),
+    )
+    connection.execute(user_stats.insert().from_select(
+        ["user_id", "total_predictions", "total_vehicles", "total_services", "upcoming_services"], totals))
+
+    user_monthly_stats = sa.table(
+        "user_monthly_stats",
+        sa.column("user_id", sa.Integer), sa.column("month", sa.String), sa.column("predictions", sa.Integer),
+    )
+    month = month_of(prediction_history.c.created_at, connection.dialect.name)
+    monthly = (
+        sa.select(prediction_history.c.user_id, month, sa.func.count())
+        .where(prediction_history.c.created_at.isnot(None))
+        .group_by(prediction_history.c.user_id, month)
+    )
+    connection.execute(user_monthly_stats.insert().from_select(["user_id", "month", "predictions"], monthly))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_stats')
+    op.drop_table('user_monthly_stats')
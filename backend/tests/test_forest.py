@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.forest import CompiledForest, compile_forest, load_model
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 4))
+    y = ((X[:, 0] + X[:, 1] * X[:, 3] + rng.normal(scale=0.5, size=len(X))) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+    return model, X
+
+
+def test_predict_proba_matches_sklearn(fitted):
+    model, X = fitted
+    forest = compile_forest(model)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+
+def test_predict_proba_matches_across_chunks(fitted):
+    model, X = fitted
+    forest = compile_forest(model)
+    assert np.array_equal(forest.predict_proba(X, chunk_size=7), model.predict_proba(X))
+
+
+def test_save_load_round_trip(fitted, tmp_path):
+    model, X = fitted
+    path = tmp_path / "model.npz"
+    compile_forest(model).save(path)
+
+    loaded = load_model(str(path))
+    assert isinstance(loaded, CompiledForest)
+    assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.forest import CompiledForest, compile_forest
+from app.ml.compact_models import pareto_front, variant_name
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 4))
+    y = ((X[:, 0] + X[:, 1] * X[:, 3] + rng.normal(scale=0.5, size=len(X))) > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+    return model, X
+
+
+def truncated_proba(estimator, X, max_depth):
+    """sklearn's class mix at the deepest node of each decision path no deeper than max_depth."""
+    tree = estimator.tree_
+    depth = np.zeros(tree.node_count, dtype=int)
+    for node in range(tree.node_count):
+        for child in (tree.children_left[node], tree.children_right[node]):
+            if child != -1:
+                depth[child] = depth[node] + 1
+    value = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+    paths = estimator.decision_path(X.astype(np.float32)).tolil().rows
+    nodes = [max((n for n in path if depth[n] <= max_depth), key=lambda n: depth[n]) for path in paths]
+    return value[nodes]
+
+
+def test_prune_without_limits_is_identity(fitted):
+    model, X = fitted
+    forest = compile_forest(model)
+    pruned = forest.prune()
+    assert pruned.n_estimators == forest.n_estimators
+    assert np.array_equal(pruned.predict_proba(X), forest.predict_proba(X))
+
+
+def test_prune_trees_matches_first_estimators(fitted):
+    model, X = fitted
+    pruned = compile_forest(model).prune(n_estimators=10)
+    expected = np.mean([tree.predict_proba(X) for tree in model.estimators_[:10]], axis=0)
+    assert pruned.n_estimators == 10
+    assert np.allclose(pruned.predict_proba(X), expected)
+
+
+def test_prune_depth_matches_truncated_decision_paths(fitted):
+    model, X = fitted
+    pruned = compile_forest(model).prune(n_estimators=5, max_depth=3)
+    expected = np.mean([truncated_proba(tree, X, 3) for tree in model.estimators_[:5]], axis=0)
+    assert pruned.node_depths().max() <= 3
+    assert np.allclose(pruned.predict_proba(X), expected)
+
+
+def test_prune_float32_variant_round_trip(fitted, tmp_path):
+    model, X = fitted
+    pruned = compile_forest(model).prune(n_estimators=10, max_depth=4, value_dtype=np.float32)
+    path = tmp_path / "model.npz"
+    pruned.save(path)
+
+    loaded = CompiledForest.load(str(path))
+    assert loaded.value.dtype == np.float32
+    proba = loaded.predict_proba(X)
+    assert np.array_equal(proba, pruned.predict_proba(X))
+    assert np.allclose(proba.sum(axis=1), 1.0, atol=1e-5)
+
+
+def test_variant_name():
+    assert variant_name(50, 8, True) == "t50_d8_f32"
+    assert variant_name(300, None, False) == "t300_full_f64"
+
+
+def test_pareto_front_drops_dominated_variants():
+    rows = [
+        {"name": "fast", "holdout_accuracy": 0.80, "p99_ms": 0.1},
+        {"name": "accurate", "holdout_accuracy": 0.90, "p99_ms": 0.5},
+        {"name": "dominated", "holdout_accuracy": 0.85, "p99_ms": 0.6},
+    ]
+    assert pareto_front(rows) == ["fast", "accurate"]
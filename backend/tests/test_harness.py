@@ -0,0 +1,42 @@
+from collections import Counter
+
+import pytest
+
+from benchmarks.harness import compare, summarize
+
+
+def result(rps, p50, p95, p99, error_rate=0.0):
+    return {"rps": rps, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "error_rate": error_rate}
+
+
+def regressed(rows):
+    return {(key, metric) for key, metric, _, _, flag in rows if flag}
+
+
+def test_compare_within_thresholds():
+    baseline = {"inprocess/predict": result(100, 10, 20, 30)}
+    current = {"inprocess/predict": result(95, 11, 23, 35, 0.005)}
+    assert regressed(compare(current, baseline, 0.10, 0.20, 0.01)) == set()
+
+
+def test_compare_flags_each_regression():
+    baseline = {"inprocess/predict": result(100, 10, 20, 30)}
+    current = {"inprocess/predict": result(80, 10, 30, 30, 0.05)}
+    assert regressed(compare(current, baseline, 0.10, 0.20, 0.01)) == {
+        ("inprocess/predict", "rps"), ("inprocess/predict", "p95_ms"), ("inprocess/predict", "error_rate"),
+    }
+
+
+def test_compare_skips_workloads_missing_from_either_run():
+    baseline = {"inprocess/login": result(2, 500, 600, 700)}
+    current = {"uvicorn/login": result(1, 900, 900, 900)}
+    assert compare(current, baseline, 0.10, 0.20, 0.01) == []
+
+
+def test_summarize_counts_rejections_and_transport_errors():
+    statuses = Counter({200: 6, 304: 1, 429: 2, "ReadTimeout": 1})
+    summary = summarize([0.001 * i for i in range(1, 11)], statuses, elapsed=2.0)
+    assert summary["requests"] == 10
+    assert summary["rps"] == 5.0
+    assert summary["error_rate"] == 0.3
+    assert summary["p50_ms"] == pytest.approx(5.0)
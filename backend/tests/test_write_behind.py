@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import CheckConstraint, Column, Integer, MetaData, Table, create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.write_behind import WriteBehindBuffer
+
+metadata = MetaData()
+readings = Table(
+    "readings", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("value", Integer, CheckConstraint("value >= 0"), nullable=False),
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def insert_rows(engine):
+    def write_batch(rows):
+        with engine.begin() as connection:
+            connection.execute(insert(readings), rows)
+    return write_batch
+
+
+def stored(engine):
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(readings.c.value)).scalars())
+
+
+def test_bad_row_is_dropped_and_the_rest_are_written(engine):
+    buffer = WriteBehindBuffer(insert_rows(engine), max_batch=100, max_delay_ms=10_000, retry_delay=0.01)
+    buffer.start()
+    for value in (1, 2, -1, 3):
+        buffer.add({"value": value})
+    buffer.stop()
+
+    assert stored(engine) == [1, 2, 3]
+    stats = buffer.stats()
+    assert stats["written"] == 3
+    assert stats["dropped"] == 1
+    assert stats["depth"] == 0
+
+
+def test_transient_failure_keeps_the_batch_for_retry(engine):
+    write = insert_rows(engine)
+    failures = [OperationalError("INSERT", {}, Exception("database is locked"))]
+
+    def flaky(rows):
+        if failures:
+            raise failures.pop()
+        write(rows)
+
+    buffer = WriteBehindBuffer(flaky, max_batch=2, max_delay_ms=10_000, retry_delay=0.01)
+    buffer.start()
+    buffer.add({"value": 1})
+    buffer.add({"value": 2})
+    buffer.stop()
+
+    assert stored(engine) == [1, 2]
+    stats = buffer.stats()
+    assert stats["errors"] == 1
+    assert stats["dropped"] == 0